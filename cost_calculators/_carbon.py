@@ -0,0 +1,21 @@
+# Carbon emissions (ton CO2) of flood damage and floodwalls, shared by all
+# cost calculators. Carbon will be multiplied by SCC in environment.
+
+K_FLOOD = 445.1 * 0.77 / 1000000  # ton CO2 per $ of flood damage (2007 $)
+K_FLOODWALL_CONSTRUCTION = 8000 * 0.89 / 1000000 * 243  # ton CO2 per m of floodwall height
+FLOODWALL_MAINTENANCE = 100 * 0.89 / 1000000 * 385  # ton CO2 per year
+
+
+def flood_carbon(flood_damage):
+    """Calculate carbon costs from flood damage"""
+    return K_FLOOD * flood_damage
+
+
+def construction_carbon_floodwall(height):
+    """Calculate carbon costs from floodwall construction"""
+    return K_FLOODWALL_CONSTRUCTION * height
+
+
+def maintenance_carbon_floodwall():
+    """Calculate carbon costs from floodwall maintenance"""
+    return FLOODWALL_MAINTENANCE
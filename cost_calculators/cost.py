@@ -0,0 +1,5 @@
+from collections import namedtuple
+
+# Monetary and carbon costs returned by the cost calculators. Carbon costs
+# are in tons of CO2 and are multiplied by the SCC in the environment.
+Cost = namedtuple('Cost', ['monetary', 'carbon'])
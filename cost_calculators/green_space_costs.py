@@ -1,13 +1,29 @@
+import math
 import numpy as np
 from values_slr import slr
 from values_surge import surge
+from cost_calculators.cost import Cost
+from cost_calculators._carbon import flood_carbon
+from cost_calculators.water_levels import SLR_M, SURGE_M
+from cost_calculators.piecewise import (quadratic, linear, piecewise_table, pack_tables,
+                                        evaluate_piecewise_packed)
+from cost_calculators.piecewise_costs import PiecewiseCosts
 
-class GreenSpaceCosts:
-    """Cost calculator for green space and floodwall protection system"""
+
+class GreenSpaceCosts(PiecewiseCosts):
+    """
+    Cost calculator for green space and floodwall protection system
+
+    System states:
+        0: No protection
+        1: Only green space
+        2: Only floodwall
+        3: Both green space and floodwall
+    """
     
-    def __init__(self, params):
+    def _init_component(self, params):
         """
-        Initialize with borough-specific parameters
+        Set the borough-specific parameters of the component
         
         Args:
             params: Parameter object containing:
@@ -25,136 +41,70 @@ class GreenSpaceCosts:
                 - discount_factor: Discount factor (default 0.97)
                     Note: Discount factor will be applied at environment level
         """
-        self.params = params
         self.discount_factor = getattr(params, 'discount_factor', 0.97)
         
-        # Calculate derived values
-        self.cf = -self.params.vulnerability_factor * self.params.exposure_value
-        self.vol_z = 0.5 * self.params.city_height * (1/self.params.slope) * self.params.city_height
-        
         # Seawall height
         self.seawall_h = params.seawall_height
         
         # Green space parameters
         self.b_green = params.green_space_params['b_green']
         self.t_green = params.green_space_params['t_green']
-        self.l_green = np.sqrt(((self.t_green - self.b_green)/self.params.slope)**2 + 
-                              (self.t_green - self.b_green)**2)  # Length of green space
+        self.l_green = math.sqrt(((self.t_green - self.b_green)/self.params.slope)**2 + 
+                                (self.t_green - self.b_green)**2)  # Length of green space
         
         # Floodwall parameters
         self.b2 = params.floodwall_params['b2']
         self.t2 = params.floodwall_params['t2']
         self.h2 = self.t2 - self.b2  # Height of floodwall
 
-    def calculate_flood_damage(self, water_levels, system_state):
+        # Partial flooded areas above the seawall, invariant across water levels
+        k = 0.5 * self._inv_slope
+        self._a1 = k * (self.b_green - self.seawall_h)**2  # Up to bottom of green space
+        self._a2 = k * (self.t_green - self.seawall_h)**2 - self._a1  # Across green space
+        self._a3 = k * (self.b2 - self.seawall_h)**2 - self._a1 - self._a2  # Up to base of floodwall
+
+    def _build_piecewise(self):
         """
-        Calculate flood damage costs based on water level and system state
-        
-        Args:
-            water_levels: tuple (slr_value, surge_value) in meters
-            system_state: int (0-3) representing system configuration:
-                0: No protection
-                1: Only green space
-                2: Only floodwall
-                3: Both green space and floodwall
-        
+        Tabulate the flooded area cascade of each system state
+
         Returns:
-            Dictionary containing monetary and carbon costs
+            List indexed by system_state of (breakpoints, coefs) tables,
+            see cost_calculators.piecewise
         """
-        slr_value, surge_value = water_levels
-        total_height = slr_value + surge_value
-        
-        # Calculate flooded area based on system state
-        if system_state == 0:  # No protection
-            # Adjust water level for seawall
-            if total_height <= self.seawall_h:
-                total_height = 0
-            else:
-                total_height = total_height - self.seawall_h
-                
-            # Calculate flooded area
-            area = 0.5 * (1/self.params.slope) * total_height**2
-            
-        elif system_state == 1:  # Only green space
-            if total_height <= self.seawall_h:
-                total_height = 0
-                area = 0
-            elif total_height > self.seawall_h and total_height <= self.b_green:
-                f_damage = 1.0
-                total_height = total_height - self.seawall_h
-                area = 0.5 * f_damage * (1/self.params.slope) * total_height**2
-            elif total_height > self.b_green and total_height <= self.t_green:
-                f_damage1 = 1.00
-                a1 = 0.5 * (1/self.params.slope) * (self.b_green - self.seawall_h)**2
-                f_damage2 = 0.80
-                a2 = 0.5 * (1/self.params.slope) * (total_height - self.seawall_h)**2 - a1
-                area = a1 * f_damage1 + a2 * f_damage2
-            else:  # total_height > t_green
-                f_damage1 = 1.00
-                a1 = 0.5 * (1/self.params.slope) * (self.b_green - self.seawall_h)**2
-                f_damage2 = 0.80
-                a2 = 0.5 * (1/self.params.slope) * (self.t_green - self.seawall_h)**2 - a1
-                a3 = 0.5 * (1/self.params.slope) * (total_height - self.seawall_h)**2 - a1 - a2
-                area = a1 * f_damage1 + a2 * f_damage2 + a3 * f_damage1
-                
-        elif system_state == 2:  # Only floodwall
-            if total_height <= self.seawall_h:
-                total_height = 0
-                area = 0
-            elif total_height > self.b2 and total_height <= self.t2:
-                area = 0.5 * (self.b2 - self.seawall_h) * (self.b2 - self.seawall_h) * (1/self.params.slope) + \
-                       (total_height - self.b2) * (self.b2 - self.seawall_h) * (1/self.params.slope)
-            else:
-                area = 0.5 * (1/self.params.slope) * (total_height - self.seawall_h)**2
-            
-        else:  # Both green space and floodwall
-            if total_height <= self.seawall_h:
-                total_height = 0
-                area = 0
-            elif total_height > self.seawall_h and total_height <= self.b_green:
-                f_damage = 1.0
-                total_height = total_height - self.seawall_h
-                area = 0.5 * f_damage * (1/self.params.slope) * total_height**2
-            elif total_height > self.b_green and total_height <= self.t_green:
-                f_damage1 = 1.00
-                a1 = 0.5 * (1/self.params.slope) * (self.b_green - self.seawall_h)**2
-                f_damage2 = 0.80
-                a2 = 0.5 * (1/self.params.slope) * (total_height - self.seawall_h)**2 - a1
-                area = a1 * f_damage1 + a2 * f_damage2
-            elif total_height > self.t_green and total_height <= self.b2:
-                f_damage1 = 1.00
-                a1 = 0.5 * (1/self.params.slope) * (self.b_green - self.seawall_h)**2
-                f_damage2 = 0.80
-                a2 = 0.5 * (1/self.params.slope) * (self.t_green - self.seawall_h)**2 - a1
-                a3 = 0.5 * (1/self.params.slope) * (total_height - self.seawall_h)**2 - a1 - a2
-                area = a1 * f_damage1 + a2 * f_damage2 + a3 * f_damage1
-            elif total_height > self.b2 and total_height <= self.t2:
-                f_damage1 = 1.00
-                a1 = 0.5 * (1/self.params.slope) * (self.b_green - self.seawall_h)**2
-                f_damage2 = 0.80
-                a2 = 0.5 * (1/self.params.slope) * (self.t_green - self.seawall_h)**2 - a1
-                a3 = 0.5 * (1/self.params.slope) * (self.b2 - self.seawall_h)**2 - a1 - a2
-                a4 = (total_height - self.b2) * (self.b2 - self.seawall_h) * (1/self.params.slope)
-                area = a1 * f_damage1 + a2 * f_damage2 + a3 * f_damage1 + a4 * f_damage1
-            else:  # total_height > t2
-                f_damage1 = 1.00
-                a1 = 0.5 * (1/self.params.slope) * (self.b_green - self.seawall_h)**2
-                f_damage2 = 0.80
-                a2 = 0.5 * (1/self.params.slope) * (self.t_green - self.seawall_h)**2 - a1
-                a3 = 0.5 * (1/self.params.slope) * (self.b2 - self.seawall_h)**2 - a1 - a2
-                a4 = 0.5 * (1/self.params.slope) * (total_height - self.seawall_h)**2 - a1 - a2 - a3
-                area = a1 * f_damage1 + a2 * f_damage2 + a3 * f_damage1 + a4 * f_damage1
-
-        # Calculate flood damage
-        c_flood = self.cf * area / self.vol_z
-        c_flood_carbon = self.calculate_flood_carbon_cost(c_flood)
-        
-        return {
-            'monetary': c_flood,
-            'carbon': c_flood_carbon  # Will be multiplied by SCC in environment
-        }
+        k = 0.5 * self._inv_slope
+        seawall_h = self.seawall_h
+        a1, a2, a3 = self._a1, self._a2, self._a3
+        f_damage2 = 0.80  # Damage factor behind green space
+
+        no_flood = (0.0, 0.0, 0.0)
+        above_seawall = quadratic(k, seawall_h)
+        # a1 + f_damage2 * a2 with a2 growing with water height
+        in_green = quadratic(f_damage2 * k, seawall_h, (1 - f_damage2) * a1)
+        # a1 + f_damage2 * a2 + a3 with a3 growing with water height
+        over_green = quadratic(k, seawall_h, (f_damage2 - 1) * a2)
+
+        def floodwall(area_below):
+            """Segment with water held back by the floodwall"""
+            return linear((self.b2 - seawall_h) * self._inv_slope, self.b2, area_below)
+
+        # Segments shared by states 1 and 3, up to the top of the green space
+        green_breakpoints = [seawall_h, self.b_green, self.t_green]
+        green_segments = [no_flood, above_seawall, in_green, over_green]
 
-    def calculate_construction_cost(self, action):
+        return [
+            # 0: No protection
+            piecewise_table([seawall_h], [no_flood, above_seawall]),
+            # 1: Only green space
+            piecewise_table(green_breakpoints, green_segments),
+            # 2: Only floodwall
+            piecewise_table([seawall_h, self.b2, self.t2],
+                            [no_flood, above_seawall, floodwall(a1 + a2 + a3), above_seawall]),
+            # 3: Both green space and floodwall
+            piecewise_table(green_breakpoints + [self.b2, self.t2],
+                            green_segments + [floodwall(a1 + f_damage2 * a2 + a3), over_green]),
+        ]
+
+    def _compute_construction_cost(self, action):
         """
         Calculate construction costs for given action
         
@@ -176,12 +126,9 @@ class GreenSpaceCosts:
             monetary = base_cost_per_meter * self.h2
             carbon = self.calculate_construction_carbon_floodwall(self.h2)
             
-        return {
-            'monetary': monetary,
-            'carbon': carbon  # Will be multiplied by SCC in environment
-        }
+        return Cost(monetary, carbon)  # Carbon will be multiplied by SCC in environment
 
-    def calculate_maintenance_cost(self, system_state):
+    def _compute_maintenance_cost(self, system_state):
         """Calculate annual maintenance costs based on system state"""
         if system_state == 0:  # No protection
             monetary = 0
@@ -199,10 +146,7 @@ class GreenSpaceCosts:
             carbon = (self.calculate_maintenance_carbon_green() + 
                      self.calculate_maintenance_carbon_floodwall())
             
-        return {
-            'monetary': monetary,
-            'carbon': carbon  # Will be multiplied by SCC in environment
-        }
+        return Cost(monetary, carbon)  # Carbon will be multiplied by SCC in environment
 
     def calculate_carbon_absorption(self, system_state):
         """Calculate carbon absorption by green infrastructure"""
@@ -212,30 +156,62 @@ class GreenSpaceCosts:
         else:
             return 0
 
-    def calculate_flood_carbon_cost(self, flood_damage):
-        """Calculate carbon costs from flood damage"""
-        flood_cost_2007 = (flood_damage / 1000000) * 0.77
-        fd_ghg = 445.1 * flood_cost_2007
-        return fd_ghg  # Will be multiplied by SCC in environment
-
     def calculate_construction_carbon_green(self):
         """Calculate carbon costs from green space construction"""
         carbon_green_c = 1.6/1000  # ton CO2 per m²
         return -(carbon_green_c) * self.l_green  # Will be multiplied by SCC in environment
 
-    def calculate_construction_carbon_floodwall(self, height):
-        """Calculate carbon costs from floodwall construction"""
-        cost_2007 = (8000 * height) * 0.89
-        cost_million = cost_2007 / 1000000
-        return cost_million * 243  # Will be multiplied by SCC in environment
-
     def calculate_maintenance_carbon_green(self):
         """Calculate carbon costs from green space maintenance"""
         carbon_green_m = 0.09/1000  # ton CO2 per m²
         return -(carbon_green_m) * self.l_green  # Will be multiplied by SCC in environment
 
-    def calculate_maintenance_carbon_floodwall(self):
-        """Calculate carbon costs from floodwall maintenance"""
-        cost_2007 = 100 * 0.89
-        cost_million = cost_2007 / 1000000
-        return cost_million * 385  # Will be multiplied by SCC in environment 
\ No newline at end of file
+class GreenSpaceCostsBatch:
+    """Flood damage of the green space and floodwall system for many boroughs at once"""
+
+    def __init__(self, params_list):
+        """
+        Initialize with the parameters of each borough
+
+        Args:
+            params_list: Sequence of parameter objects, see GreenSpaceCosts
+        """
+        calculators = [GreenSpaceCosts(params) for params in params_list]
+        # Area tables of every borough and system state, table 4 * borough + system_state
+        self.breakpoints, self.coefs = pack_tables([table for c in calculators for table in c._piecewise])
+        self.n_boroughs = len(calculators)
+        # Monetary flood damage per unit flooded area of each borough
+        self.cf_area = np.array([c._cf_area for c in calculators], dtype=np.float64)
+
+    def calculate_flood_damage_batch(self, states, system_states, borough_ids=0):
+        """
+        Calculate flood damage costs for arrays of discretized water states
+
+        Args:
+            states: (n, 2) array of (slr_state, surge_state) indices
+            system_states: (n,) array of system states (0-3), see
+                GreenSpaceCosts
+            borough_ids: (n,) array (or scalar) of indices into params_list
+
+        Returns:
+            Cost tuple of (n,) arrays of monetary and carbon costs
+
+        Raises:
+            ValueError: If a system state is outside [0, 4) or a borough id
+                outside [0, n_boroughs)
+        """
+        states = np.asarray(states)
+        system_states = np.asarray(system_states)
+        borough_ids = np.broadcast_to(borough_ids, system_states.shape)
+        # Out of range values would index another borough's tables
+        if system_states.size and (system_states.min() < 0 or system_states.max() >= 4):
+            raise ValueError(f'system_states must be in [0, 4), got {system_states.tolist()}')
+        if borough_ids.size and (borough_ids.min() < 0 or borough_ids.max() >= self.n_boroughs):
+            raise ValueError(f'borough_ids must be in [0, {self.n_boroughs}), got {borough_ids.tolist()}')
+        total_height = SLR_M[states[:, 0]] + SURGE_M[states[:, 1]]
+        area = evaluate_piecewise_packed(total_height, 4 * borough_ids + system_states,
+                                         self.breakpoints, self.coefs)
+
+        c_flood = self.cf_area[borough_ids] * area
+        c_flood_carbon = flood_carbon(c_flood)
+        return Cost(c_flood, c_flood_carbon)  # Carbon will be multiplied by SCC in environment
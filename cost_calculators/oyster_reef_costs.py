@@ -1,7 +1,12 @@
 import numpy as np
+from numba import njit, float64
 from values_slr import slr
 from values_surge import surge
+from cost_calculators.cost import Cost
+from cost_calculators.piecewise import quadratic, linear, piecewise_table, evaluate_piecewise
+from cost_calculators.piecewise_costs import AttenuatedPiecewiseCosts
 
+@njit(float64(float64), cache=True)
 def calculate_wave_attenuation(total_height):
     """
     Calculate wave attenuation factor for oyster reef based on water depth
@@ -18,15 +23,41 @@ def calculate_wave_attenuation(total_height):
         return 0.40
     elif total_height > 1.0 and total_height <= 1.5:
         return 0.10
-    elif total_height > 1.5:
+    else:  # total_height > 1.5
         return 0.05
 
-class OysterReefCosts:
-    """Cost calculator for oyster reef and floodwall protection system"""
+
+def _wave_attenuation_grid(total_height):
+    """calculate_wave_attenuation evaluated over an array of water depths"""
+    return np.select([total_height <= 0.5, total_height <= 1.0, total_height <= 1.5],
+                     [0.50, 0.40, 0.10], default=0.05)
+
+
+@njit(float64(float64, float64, float64[::1], float64[:, ::1]), cache=True)
+def _oyster_reef_area(total_height, surge_value, breakpoints, coefs):
+    """Flooded area behind oyster reef after wave attenuation (see OysterReefCosts.calculate_flood_damage)"""
+    # Apply wave attenuation, capped at surge height
+    height_reduction = min(calculate_wave_attenuation(total_height) * total_height, surge_value)
+    return evaluate_piecewise(total_height - height_reduction, breakpoints, coefs)
+
+class OysterReefCosts(AttenuatedPiecewiseCosts):
+    """
+    Cost calculator for oyster reef and floodwall protection system
+
+    System states:
+        0: No protection
+        1: Only oyster reef
+        2: Only floodwall
+        3: Both oyster reef and floodwall
+    """
+
+    # States with oyster reef, whose water height is attenuated
+    REDUCED_STATES = (1, 3)
+    _reduced_area = staticmethod(_oyster_reef_area)
     
-    def __init__(self, params):
+    def _init_component(self, params):
         """
-        Initialize with borough-specific parameters
+        Set the borough-specific parameters of the component
         
         Args:
             params: Parameter object containing:
@@ -42,12 +73,6 @@ class OysterReefCosts:
                 - discount_factor: Discount factor (default 0.97)
                     Note: Discount factor will be applied at environment level
         """
-        self.params = params
-        
-        # Calculate derived values
-        self.cf = -self.params.vulnerability_factor * self.params.exposure_value
-        self.vol_z = 0.5 * self.params.city_height * (1/self.params.slope) * self.params.city_height
-        
         # Oyster reef parameters
         self.reef_width = params.oyster_reef_params['width']  # Width before wedge starts
         
@@ -56,71 +81,32 @@ class OysterReefCosts:
         self.t2 = params.floodwall_params['t2']  # Top height
         self.h2 = self.t2 - self.b2  # Height of floodwall
 
-    def calculate_flood_damage(self, water_levels, system_state):
+    def _build_piecewise(self):
         """
-        Calculate flood damage costs based on water level and system state
-        
-        Args:
-            water_levels: tuple (slr_value, surge_value) in meters
-            system_state: int (0-3) representing system configuration:
-                0: No protection
-                1: Only oyster reef
-                2: Only floodwall
-                3: Both oyster reef and floodwall
-        
+        Tabulate the flooded area of each system state over the water height
+        remaining after wave attenuation
+
         Returns:
-            Dictionary containing monetary and carbon costs
+            List indexed by system_state of (breakpoints, coefs) tables,
+            see cost_calculators.piecewise
         """
-        slr_value, surge_value = water_levels
-        total_height = slr_value + surge_value
-        
-        # Calculate flooded area based on system state
-        if system_state == 0:  # No protection
-            area = 0.5 * (1/self.params.slope) * total_height**2
-            
-        elif system_state == 1:  # Only oyster reef
-            # Apply wave attenuation
-            wa_factor = calculate_wave_attenuation(total_height)
-            height_reduction = wa_factor * total_height
-            # Cap reduction at surge height
-            if height_reduction >= surge_value:
-                height_reduction = surge_value
-            reduced_height = total_height - height_reduction
-            area = 0.5 * (1/self.params.slope) * reduced_height**2
-            
-        elif system_state == 2:  # Only floodwall
-            if total_height > self.b2 and total_height <= self.t2:
-                area = 0.5 * self.b2 * self.b2 * (1/self.params.slope) + \
-                       (total_height - self.b2) * self.b2 * (1/self.params.slope)
-            else:
-                area = 0.5 * (1/self.params.slope) * total_height**2
-                
-        else:  # Both oyster reef and floodwall
-            # Apply wave attenuation first
-            wa_factor = calculate_wave_attenuation(total_height)
-            height_reduction = wa_factor * total_height
-            # Cap reduction at surge height
-            if height_reduction >= surge_value:
-                height_reduction = surge_value
-            reduced_height = total_height - height_reduction
-            
-            # Then apply floodwall protection
-            if reduced_height > self.b2 and reduced_height <= self.t2:
-                area = 0.5 * self.b2 * self.b2 * (1/self.params.slope) + \
-                       (reduced_height - self.b2) * self.b2 * (1/self.params.slope)
-            else:
-                area = 0.5 * (1/self.params.slope) * reduced_height**2
-
-        # Calculate flood damage
-        c_flood = self.cf * area / self.vol_z
-        c_flood_carbon = self.calculate_flood_carbon_cost(c_flood)
-        
-        return {
-            'monetary': c_flood,
-            'carbon': c_flood_carbon  # Will be multiplied by SCC in environment
-        }
+        k = 0.5 * self._inv_slope
+        unprotected = quadratic(k, 0.0)
+        no_floodwall = piecewise_table([], [unprotected])
+        floodwall = piecewise_table([self.b2, self.t2],
+                                    [unprotected,
+                                     linear(self.b2 * self._inv_slope, self.b2, k * self.b2 * self.b2),
+                                     unprotected])
+        # 0: No protection, 1: Only oyster reef, 2: Only floodwall, 3: Both
+        return [no_floodwall, no_floodwall, floodwall, floodwall]
+
+    def _reduced_height_grid(self, total_height, surge_value):
+        """Water height left behind the oyster reef, over arrays of discretized water levels"""
+        # Apply wave attenuation, capped at surge height
+        height_reduction = np.minimum(_wave_attenuation_grid(total_height) * total_height, surge_value)
+        return total_height - height_reduction
 
-    def calculate_construction_cost(self, action):
+    def _compute_construction_cost(self, action):
         """
         Calculate construction costs for given action
         
@@ -142,12 +128,9 @@ class OysterReefCosts:
             monetary = base_cost_per_meter * self.h2
             carbon = self.calculate_construction_carbon_floodwall(self.h2)
             
-        return {
-            'monetary': monetary,
-            'carbon': carbon  # Will be multiplied by SCC in environment
-        }
+        return Cost(monetary, carbon)  # Carbon will be multiplied by SCC in environment
 
-    def calculate_maintenance_cost(self, system_state):
+    def _compute_maintenance_cost(self, system_state):
         """Calculate annual maintenance costs based on system state"""
         if system_state == 0:  # No protection
             monetary = 0
@@ -163,10 +146,7 @@ class OysterReefCosts:
             carbon = (self.calculate_maintenance_carbon_reef() + 
                      self.calculate_maintenance_carbon_floodwall())
             
-        return {
-            'monetary': monetary,
-            'carbon': carbon  # Will be multiplied by SCC in environment
-        }
+        return Cost(monetary, carbon)  # Carbon will be multiplied by SCC in environment
 
     def calculate_carbon_absorption(self, system_state):
         """Calculate carbon absorption by oyster reef"""
@@ -175,30 +155,12 @@ class OysterReefCosts:
             return carbon_up_reef * self.reef_width  # Will be multiplied by SCC in environment
         return 0
 
-    def calculate_flood_carbon_cost(self, flood_damage):
-        """Calculate carbon costs from flood damage"""
-        flood_cost_2007 = (flood_damage / 1000000) * 0.77
-        fd_ghg = 445.1 * flood_cost_2007
-        return fd_ghg  # Will be multiplied by SCC in environment
-
     def calculate_construction_carbon_reef(self):
         """Calculate carbon costs from oyster reef construction"""
         carbon_reef_c = 0.5/1000  # ton CO2 per m²
         return -(carbon_reef_c) * self.reef_width  # Will be multiplied by SCC in environment
 
-    def calculate_construction_carbon_floodwall(self, height):
-        """Calculate carbon costs from floodwall construction"""
-        cost_2007 = (8000 * height) * 0.89
-        cost_million = cost_2007 / 1000000
-        return cost_million * 243  # Will be multiplied by SCC in environment
-
     def calculate_maintenance_carbon_reef(self):
         """Calculate carbon costs from oyster reef maintenance"""
         carbon_reef_m = 0.0  # No maintenance carbon cost
         return carbon_reef_m
-
-    def calculate_maintenance_carbon_floodwall(self):
-        """Calculate carbon costs from floodwall maintenance"""
-        cost_2007 = 100 * 0.89
-        cost_million = cost_2007 / 1000000
-        return cost_million * 385  # Will be multiplied by SCC in environment 
\ No newline at end of file
@@ -0,0 +1,128 @@
+import numpy as np
+from numba import cuda, njit, prange, float64
+
+# Smallest number of heights worth evaluating on the GPU; below this the
+# transfer and launch overhead outweighs the arithmetic
+CUDA_MIN_SIZE = 1000000
+
+
+def quadratic(scale, origin, offset=0.0):
+    """Coefficients (a, b, c) of a + b*h + c*h**2 equal to scale*(h - origin)**2 + offset"""
+    return (scale * origin**2 + offset, -2 * scale * origin, scale)
+
+
+def linear(slope, origin, offset=0.0):
+    """Coefficients (a, b, c) of a + b*h + c*h**2 equal to slope*(h - origin) + offset"""
+    return (offset - slope * origin, slope, 0.0)
+
+
+def piecewise_table(breakpoints, segments):
+    """
+    Tabulate an if/elif cascade on water height as a piecewise quadratic
+
+    Args:
+        breakpoints: Upper bounds x_k of the cascade branches (h <= x_k),
+            in the order they are checked
+        segments: (a, b, c) coefficients of each branch, followed by
+            those of the final else branch
+
+    Returns:
+        Tuple (breakpoints, coefs) for evaluate_piecewise. Breakpoints are
+        made non-decreasing so that a branch shadowed by an earlier one
+        is never selected, as in the cascade.
+    """
+    breakpoints = np.maximum.accumulate(np.asarray(breakpoints, dtype=np.float64).reshape(-1))
+    coefs = np.array(segments, dtype=np.float64).reshape(-1, 3)
+    return breakpoints, coefs
+
+
+@njit(float64(float64, float64[::1], float64[:, ::1]), cache=True)
+def evaluate_piecewise(h, breakpoints, coefs):
+    """Evaluate a tabulated piecewise quadratic at a single height"""
+    idx = np.searchsorted(breakpoints, h)
+    return coefs[idx, 0] + coefs[idx, 1] * h + coefs[idx, 2] * h * h
+
+
+def pack_tables(tables):
+    """
+    Pad a list of (breakpoints, coefs) tables to common array shapes
+
+    Returns:
+        Tuple (breakpoints, coefs) of (n_tables, K) and (n_tables, K + 1, 3)
+        arrays. Breakpoints are padded with +inf so padded segments are
+        never selected.
+    """
+    n_breakpoints = max(len(breakpoints) for breakpoints, _ in tables)
+    packed_breakpoints = np.full((len(tables), n_breakpoints), np.inf)
+    packed_coefs = np.zeros((len(tables), n_breakpoints + 1, 3))
+    for k, (breakpoints, coefs) in enumerate(tables):
+        packed_breakpoints[k, :len(breakpoints)] = breakpoints
+        packed_coefs[k, :len(coefs)] = coefs
+    return packed_breakpoints, packed_coefs
+
+
+def evaluate_piecewise_packed(h, table_idx, breakpoints, coefs):
+    """
+    Evaluate packed tables (see pack_tables) over an array of heights,
+    table breakpoints[table_idx[i]] at h[i]
+    """
+    # Number of breakpoints below each height, as np.searchsorted in evaluate_piecewise
+    segment = (breakpoints[table_idx] < h[:, None]).sum(axis=1)
+    c = coefs[table_idx, segment]
+    return c[:, 0] + c[:, 1] * h + c[:, 2] * h * h
+
+
+@njit(float64[:, :, ::1](float64[:, :, ::1], float64[:, ::1], float64[:, :, ::1]), parallel=True, cache=True)
+def _piecewise_states_cpu(heights, breakpoints, coefs):
+    """Evaluate table k at heights[k, i, j], in parallel over i"""
+    n_tables, n, m = heights.shape
+    out = np.empty_like(heights)
+    for i in prange(n):
+        for j in range(m):
+            for k in range(n_tables):
+                h = heights[k, i, j]
+                idx = np.searchsorted(breakpoints[k], h)
+                out[k, i, j] = coefs[k, idx, 0] + coefs[k, idx, 1] * h + coefs[k, idx, 2] * h * h
+    return out
+
+
+@cuda.jit
+def _piecewise_kernel(heights, breakpoints, coefs, out):
+    """Evaluate table k at heights[k, i, j], one thread per (k, i, j)"""
+    i, j, k = cuda.grid(3)
+    if k < heights.shape[0] and i < heights.shape[1] and j < heights.shape[2]:
+        h = heights[k, i, j]
+        # Same segment as np.searchsorted(breakpoints[k], h)
+        idx = 0
+        while idx < breakpoints.shape[1] and breakpoints[k, idx] < h:
+            idx += 1
+        out[k, i, j] = coefs[k, idx, 0] + coefs[k, idx, 1] * h + coefs[k, idx, 2] * h * h
+
+
+def evaluate_piecewise_states(heights, tables):
+    """
+    Evaluate one tabulated piecewise quadratic per leading index of heights
+
+    Runs on the GPU when one is available and the grid is large enough
+    to pay for the transfers, otherwise on all CPU cores.
+
+    Args:
+        heights: (n_tables, n, m) array of heights
+        tables: List of n_tables (breakpoints, coefs) tables
+
+    Returns:
+        (n_tables, n, m) array of values
+    """
+    heights = np.ascontiguousarray(heights, dtype=np.float64)
+    breakpoints, coefs = pack_tables(tables)
+    if heights.size < CUDA_MIN_SIZE or not cuda.is_available():
+        return _piecewise_states_cpu(heights, breakpoints, coefs)
+
+    out = cuda.device_array(heights.shape, dtype=np.float64)
+    threads = (16, 16, 1)
+    blocks = ((heights.shape[1] + threads[0] - 1) // threads[0],
+              (heights.shape[2] + threads[1] - 1) // threads[1],
+              heights.shape[0])
+    _piecewise_kernel[blocks, threads](cuda.to_device(heights), cuda.to_device(breakpoints),
+                                       cuda.to_device(coefs), out)
+    return out.copy_to_host()
@@ -0,0 +1,203 @@
+from abc import ABC, abstractmethod
+import numpy as np
+from cost_calculators.cost import Cost
+from cost_calculators._carbon import (K_FLOOD, flood_carbon, construction_carbon_floodwall,
+                                      maintenance_carbon_floodwall)
+from cost_calculators.water_levels import water_level_grid
+from cost_calculators.piecewise import evaluate_piecewise, evaluate_piecewise_states
+
+
+class PiecewiseCosts(ABC):
+    """
+    Base of the cost calculators whose flooded area is a piecewise quadratic
+    in water height, tabulated per system state by _build_piecewise
+
+    Subclasses set their own parameters in _init_component, which runs
+    before the cost tables are built.
+    """
+
+    def __init__(self, params):
+        """
+        Initialize with borough-specific parameters
+
+        Args:
+            params: Parameter object containing at least:
+                - exposure_value: Value of exposed assets ($/m width)
+                - vulnerability_factor: Vulnerability factor
+                - slope: Slope of city
+                - city_height: Height of city (m)
+                and the component parameters, see the subclass _init_component
+        """
+        self.params = params
+
+        # Calculate derived values
+        self.cf = -self.params.vulnerability_factor * self.params.exposure_value
+        self._inv_slope = 1/self.params.slope
+        self.vol_z = 0.5 * self.params.city_height * self._inv_slope * self.params.city_height
+        # Monetary and carbon flood damage per unit flooded area
+        self._cf_area = self.cf / self.vol_z
+        self._cf_carbon = self._cf_area * K_FLOOD
+
+        self._init_component(params)
+
+        # Flooded area as a piecewise quadratic in water height, per system state
+        self._piecewise = self._build_piecewise()
+
+        # Flood damage, specialized per system state
+        self._damage_fns = [self._compile_state(s) for s in range(4)]
+
+        # Flood damage for every discretized water state, stored in single
+        # precision for cache density
+        damage_money, damage_carbon = self.calculate_all()
+        self._damage_money = damage_money.astype(np.float32)
+        self._damage_carbon = damage_carbon.astype(np.float32)
+
+        # Construction and maintenance costs, fixed after initialization
+        self._construction = [self._compute_construction_cost(a) for a in range(3)]
+        self._maintenance = [self._compute_maintenance_cost(s) for s in range(4)]
+
+    @abstractmethod
+    def _init_component(self, params):
+        """Set the component parameters from params"""
+
+    @abstractmethod
+    def _build_piecewise(self):
+        """
+        Returns:
+            List indexed by system_state of (breakpoints, coefs) tables,
+            see cost_calculators.piecewise
+        """
+
+    @abstractmethod
+    def _compute_construction_cost(self, action):
+        """Calculate construction costs (Cost tuple) for action (0-2)"""
+
+    @abstractmethod
+    def _compute_maintenance_cost(self, system_state):
+        """Calculate annual maintenance costs (Cost tuple) for system_state (0-3)"""
+
+    def calculate_flood_damage(self, water_levels, system_state):
+        """
+        Calculate flood damage costs based on water level and system state
+
+        Args:
+            water_levels: tuple (slr_value, surge_value) in meters
+            system_state: int (0-3), see the subclass docstring
+
+        Returns:
+            Cost tuple of monetary and carbon costs
+        """
+        return self._damage_fns[system_state](water_levels)  # Carbon will be multiplied by SCC in environment
+
+    def _compile_state(self, system_state):
+        """
+        Build the flood damage function of one system state, with its area
+        table and damage factors bound as constants
+
+        Returns:
+            Function of water_levels (see calculate_flood_damage) returning a Cost tuple
+        """
+        breakpoints, coefs = self._piecewise[system_state]
+        cf_area, cf_carbon = self._cf_area, self._cf_carbon
+
+        def flood_damage(water_levels):
+            area = evaluate_piecewise(water_levels[0] + water_levels[1], breakpoints, coefs)
+            return Cost(cf_area * area, cf_carbon * area)
+        return flood_damage
+
+    def _height_grids(self, slr_grid, surge_grid):
+        """
+        Water height of the area lookup of each system state, over the
+        discretized water levels
+
+        Returns:
+            (4, slr_state, surge_state) array in meters
+        """
+        return np.stack([slr_grid + surge_grid] * 4)
+
+    def calculate_all(self):
+        """
+        Calculate flood damage costs for every discretized water state and
+        system state at once
+
+        Returns:
+            Tuple (monetary, carbon) of arrays indexed by
+            (system_state, slr_state, surge_state)
+        """
+        slr_grid, surge_grid = water_level_grid()
+        area = evaluate_piecewise_states(self._height_grids(slr_grid, surge_grid), self._piecewise)
+        c_flood = self._cf_area * area
+        c_flood_carbon = self._cf_carbon * area
+        return c_flood, c_flood_carbon
+
+    def calculate_flood_damage_state(self, water_state, system_state):
+        """
+        Look up flood damage costs for a discretized water state
+
+        Args:
+            water_state: (slr_state, surge_state) indices
+            system_state: int (0-3), see calculate_flood_damage
+
+        Returns:
+            Cost tuple of monetary and carbon costs
+        """
+        index = (system_state, int(water_state[0]), int(water_state[1]))
+        return Cost(float(self._damage_money[index]), float(self._damage_carbon[index]))  # Carbon will be multiplied by SCC in environment
+
+    def calculate_construction_cost(self, action):
+        """Look up construction costs for given action (0-2), see _compute_construction_cost"""
+        return self._construction[action]
+
+    def calculate_maintenance_cost(self, system_state):
+        """Look up annual maintenance costs for system_state (0-3), see _compute_maintenance_cost"""
+        return self._maintenance[system_state]
+
+    def calculate_flood_carbon_cost(self, flood_damage):
+        """Calculate carbon costs from flood damage"""
+        return flood_carbon(flood_damage)
+
+    def calculate_construction_carbon_floodwall(self, height):
+        """Calculate carbon costs from floodwall construction"""
+        return construction_carbon_floodwall(height)
+
+    def calculate_maintenance_carbon_floodwall(self):
+        """Calculate carbon costs from floodwall maintenance"""
+        return maintenance_carbon_floodwall()
+
+
+class AttenuatedPiecewiseCosts(PiecewiseCosts):
+    """
+    Base of the nature-based cost calculators that attenuate waves, lowering
+    the water height before the area lookup in the system states listed in
+    REDUCED_STATES
+    """
+
+    # System states whose water height is reduced before the area lookup
+    REDUCED_STATES = ()
+
+    @abstractmethod
+    def _reduced_height_grid(self, total_height, surge_value):
+        """Water height left for REDUCED_STATES, over arrays of discretized water levels"""
+
+    @staticmethod
+    @abstractmethod
+    def _reduced_area(total_height, surge_value, breakpoints, coefs):
+        """Flooded area for REDUCED_STATES at a single water level, from the state's table"""
+
+    def _compile_state(self, system_state):
+        if system_state not in self.REDUCED_STATES:
+            return super()._compile_state(system_state)
+        breakpoints, coefs = self._piecewise[system_state]
+        cf_area, cf_carbon = self._cf_area, self._cf_carbon
+        reduced_area = self._reduced_area
+
+        def flood_damage(water_levels):
+            area = reduced_area(water_levels[0] + water_levels[1], water_levels[1], breakpoints, coefs)
+            return Cost(cf_area * area, cf_carbon * area)
+        return flood_damage
+
+    def _height_grids(self, slr_grid, surge_grid):
+        heights = super()._height_grids(slr_grid, surge_grid)
+        # Reduced once, shared by all REDUCED_STATES
+        heights[list(self.REDUCED_STATES)] = self._reduced_height_grid(slr_grid + surge_grid, surge_grid)
+        return heights
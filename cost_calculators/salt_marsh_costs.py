@@ -1,7 +1,13 @@
 import numpy as np
+from numba import njit, float64
 from values_slr import slr
 from values_surge import surge
+from cost_calculators.cost import Cost
+from cost_calculators.water_levels import SLR_M, SURGE_M
+from cost_calculators.piecewise import quadratic, linear, piecewise_table, evaluate_piecewise
+from cost_calculators.piecewise_costs import AttenuatedPiecewiseCosts
 
+@njit(float64(float64), cache=True)
 def calculate_wave_attenuation(total_height):
     """
     Calculate wave attenuation factor for salt marsh based on water depth
@@ -17,12 +23,47 @@ def calculate_wave_attenuation(total_height):
     else:
         return (6.3398 * (total_height)**(-0.974)) / 100  # Convert percentage to fraction
 
-class SaltMarshCosts:
-    """Cost calculator for salt marsh and floodwall protection system"""
+
+# Wave attenuation factor per centimeter of water depth, covering every
+# discretized water level (all whole centimeters)
+_WA_LUT = np.array([calculate_wave_attenuation(i / 100)
+                    for i in range(int(round((SLR_M[-1] + SURGE_M[-1]) * 100)) + 1)])
+
+
+@njit(float64(float64), cache=True)
+def _wave_attenuation(total_height):
+    """calculate_wave_attenuation, looked up in _WA_LUT for depths on the centimeter grid"""
+    idx = int(round(total_height * 100))
+    if 0 <= idx < len(_WA_LUT) and abs(total_height * 100 - idx) < 1e-6:
+        return _WA_LUT[idx]
+    return calculate_wave_attenuation(total_height)
+
+
+@njit(float64(float64, float64, float64[::1], float64[:, ::1]), cache=True)
+def _salt_marsh_area(total_height, surge_value, breakpoints, coefs):
+    """Flooded area behind salt marsh after wave attenuation (see SaltMarshCosts.calculate_flood_damage)"""
+    # Apply wave attenuation, capped at surge height
+    height_reduction = min(_wave_attenuation(total_height) * total_height, surge_value)
+    return evaluate_piecewise(total_height - height_reduction, breakpoints, coefs)
+
+class SaltMarshCosts(AttenuatedPiecewiseCosts):
+    """
+    Cost calculator for salt marsh and floodwall protection system
+
+    System states:
+        0: No protection
+        1: Only salt marsh
+        2: Only floodwall
+        3: Both salt marsh and floodwall
+    """
+
+    # States with salt marsh, whose water height is attenuated
+    REDUCED_STATES = (1, 3)
+    _reduced_area = staticmethod(_salt_marsh_area)
     
-    def __init__(self, params):
+    def _init_component(self, params):
         """
-        Initialize with borough-specific parameters
+        Set the borough-specific parameters of the component
         
         Args:
             params: Parameter object containing:
@@ -38,12 +79,6 @@ class SaltMarshCosts:
                 - discount_factor: Discount factor (default 0.97)
                     Note: Discount factor will be applied at environment level
         """
-        self.params = params
-        
-        # Calculate derived values
-        self.cf = -self.params.vulnerability_factor * self.params.exposure_value
-        self.vol_z = 0.5 * self.params.city_height * (1/self.params.slope) * self.params.city_height
-        
         # Salt marsh parameters
         self.marsh_width = params.salt_marsh_params['width']  # Width before wedge starts
         
@@ -52,68 +87,32 @@ class SaltMarshCosts:
         self.t2 = params.floodwall_params['t2']  # Top height (3.3m in MATLAB)
         self.h2 = self.t2 - self.b2  # Height of floodwall
 
-    def calculate_flood_damage(self, water_levels, system_state):
+    def _build_piecewise(self):
         """
-        Calculate flood damage costs based on water level and system state
-        
-        Args:
-            water_levels: tuple (slr_value, surge_value) in meters
-            system_state: int (0-3) representing system configuration:
-                0: No protection
-                1: Only salt marsh
-                2: Only floodwall
-                3: Both salt marsh and floodwall
+        Tabulate the flooded area of each system state over the water height
+        remaining after wave attenuation
+
+        Returns:
+            List indexed by system_state of (breakpoints, coefs) tables,
+            see cost_calculators.piecewise
         """
-        slr_value, surge_value = water_levels
-        total_height = slr_value + surge_value
-        
-        # Calculate flooded area based on system state
-        if system_state == 0:  # No protection
-            area = 0.5 * (1/self.params.slope) * total_height**2
-            
-        elif system_state == 1:  # Only salt marsh
-            # Apply wave attenuation
-            wa_factor = calculate_wave_attenuation(total_height)
-            height_reduction = wa_factor * total_height
-            # Cap reduction at surge height
-            if height_reduction >= surge_value:
-                height_reduction = surge_value
-            reduced_height = total_height - height_reduction
-            area = 0.5 * (1/self.params.slope) * reduced_height**2
-            
-        elif system_state == 2:  # Only floodwall
-            if total_height > self.b2 and total_height <= self.t2:
-                area = 0.5 * self.b2 * self.b2 * (1/self.params.slope) + \
-                       (total_height - self.b2) * self.b2 * (1/self.params.slope)
-            else:
-                area = 0.5 * (1/self.params.slope) * total_height**2
-                
-        else:  # Both salt marsh and floodwall
-            # Apply wave attenuation first
-            wa_factor = calculate_wave_attenuation(total_height)
-            height_reduction = wa_factor * total_height
-            # Cap reduction at surge height
-            if height_reduction >= surge_value:
-                height_reduction = surge_value
-            reduced_height = total_height - height_reduction
-            
-            # Then apply floodwall protection
-            if reduced_height > self.b2 and reduced_height <= self.t2:
-                area = 0.5 * self.b2 * self.b2 * (1/self.params.slope) + \
-                       (reduced_height - self.b2) * self.b2 * (1/self.params.slope)
-            else:
-                area = 0.5 * (1/self.params.slope) * reduced_height**2
-
-        # Calculate flood damage
-        c_flood = self.cf * area / self.vol_z
-        c_flood_carbon = self.calculate_flood_carbon_cost(c_flood)
-        
-        return {
-            'monetary': c_flood,
-            'carbon': c_flood_carbon  # Will be multiplied by SCC in environment
-        }
+        k = 0.5 * self._inv_slope
+        unprotected = quadratic(k, 0.0)
+        no_floodwall = piecewise_table([], [unprotected])
+        floodwall = piecewise_table([self.b2, self.t2],
+                                    [unprotected,
+                                     linear(self.b2 * self._inv_slope, self.b2, k * self.b2 * self.b2),
+                                     unprotected])
+        # 0: No protection, 1: Only salt marsh, 2: Only floodwall, 3: Both
+        return [no_floodwall, no_floodwall, floodwall, floodwall]
+
+    def _reduced_height_grid(self, total_height, surge_value):
+        """Water height left behind the salt marsh, over arrays of discretized water levels"""
+        # Apply wave attenuation, capped at surge height
+        wa_factor = _WA_LUT[np.rint(total_height * 100).astype(np.intp)]
+        return total_height - np.minimum(wa_factor * total_height, surge_value)
 
-    def calculate_construction_cost(self, action):
+    def _compute_construction_cost(self, action):
         """
         Calculate construction costs for given action
         
@@ -135,12 +134,9 @@ class SaltMarshCosts:
             monetary = base_cost_per_meter * self.h2
             carbon = self.calculate_construction_carbon_floodwall(self.h2)
             
-        return {
-            'monetary': monetary,
-            'carbon': carbon  # Will be multiplied by SCC in environment
-        }
+        return Cost(monetary, carbon)  # Carbon will be multiplied by SCC in environment
 
-    def calculate_maintenance_cost(self, system_state):
+    def _compute_maintenance_cost(self, system_state):
         """Calculate annual maintenance costs based on system state"""
         if system_state == 0:  # No protection
             monetary = 0
@@ -156,10 +152,7 @@ class SaltMarshCosts:
             carbon = (self.calculate_maintenance_carbon_marsh() + 
                      self.calculate_maintenance_carbon_floodwall())
             
-        return {
-            'monetary': monetary,
-            'carbon': carbon  # Will be multiplied by SCC in environment
-        }
+        return Cost(monetary, carbon)  # Carbon will be multiplied by SCC in environment
 
     def calculate_carbon_absorption(self, system_state):
         """Calculate carbon absorption by salt marsh"""
@@ -168,30 +161,12 @@ class SaltMarshCosts:
             return carbon_up_marsh * self.marsh_width  # Will be multiplied by SCC in environment
         return 0
 
-    def calculate_flood_carbon_cost(self, flood_damage):
-        """Calculate carbon costs from flood damage"""
-        flood_cost_2007 = (flood_damage / 1000000) * 0.77
-        fd_ghg = 445.1 * flood_cost_2007
-        return fd_ghg  # Will be multiplied by SCC in environment
-
     def calculate_construction_carbon_marsh(self):
         """Calculate carbon costs from salt marsh construction"""
         carbon_marsh_c = 1.0/1000  # ton CO2 per m²
         return -(carbon_marsh_c) * self.marsh_width  # Will be multiplied by SCC in environment
 
-    def calculate_construction_carbon_floodwall(self, height):
-        """Calculate carbon costs from floodwall construction"""
-        cost_2007 = (8000 * height) * 0.89
-        cost_million = cost_2007 / 1000000
-        return cost_million * 243  # Will be multiplied by SCC in environment
-
     def calculate_maintenance_carbon_marsh(self):
         """Calculate carbon costs from salt marsh maintenance"""
         carbon_marsh_m = 0.0  # No maintenance carbon cost
         return carbon_marsh_m
-
-    def calculate_maintenance_carbon_floodwall(self):
-        """Calculate carbon costs from floodwall maintenance"""
-        cost_2007 = 100 * 0.89
-        cost_million = cost_2007 / 1000000
-        return cost_million * 385  # Will be multiplied by SCC in environment 
\ No newline at end of file
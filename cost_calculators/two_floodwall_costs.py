@@ -1,13 +1,26 @@
 import numpy as np
 from values_slr import slr
 from values_surge import surge
+from cost_calculators.cost import Cost
+from cost_calculators._carbon import construction_carbon_floodwall, maintenance_carbon_floodwall
+from cost_calculators.piecewise import quadratic, linear, piecewise_table
+from cost_calculators.piecewise_costs import PiecewiseCosts
 
-class TwoFloodwallCosts:
-    """Cost calculator for two floodwall protection system"""
+
+class TwoFloodwallCosts(PiecewiseCosts):
+    """
+    Cost calculator for two floodwall protection system
+
+    System states:
+        0: No floodwalls
+        1: Only lower floodwall (F1)
+        2: Only higher floodwall (F2)
+        3: Both floodwalls (F1, F2)
+    """
     
-    def __init__(self, params):
+    def _init_component(self, params):
         """
-        Initialize with borough-specific parameters
+        Set the borough-specific parameters of the component
         
         Args:
             params: Parameter object containing:
@@ -23,12 +36,6 @@ class TwoFloodwallCosts:
                 - discount_factor: Discount factor (default 0.97)
                     Note: Discount factor will be applied at environment level
         """
-        self.params = params
-        
-        # Calculate derived values
-        self.cf = -self.params.vulnerability_factor * self.params.exposure_value
-        self.vol_z = 0.5 * self.params.city_height * (1/self.params.slope) * self.params.city_height
-        
         # Floodwall parameters and heights
         self.b1 = params.floodwall_params['b1']
         self.t1 = params.floodwall_params['t1']
@@ -39,71 +46,38 @@ class TwoFloodwallCosts:
         self.h1 = self.t1 - self.b1  # Height of first floodwall
         self.h2 = self.t2 - self.b2  # Height of second floodwall
 
-    def calculate_flood_damage(self, water_levels, system_state):
+        # Flooded area constants, invariant across water levels
+        self._k = 0.5 * self._inv_slope
+        self._area_b1 = self._k * self.b1**2  # Flooded area up to base of F1
+        self._area_b2 = self._k * self.b2**2  # Flooded area up to base of F2
+        self._slope_f1 = self.b1 * self._inv_slope  # Area growth per m held back by F1
+        self._slope_f2 = self.b2 * self._inv_slope  # Area growth per m held back by F2
+
+    def _build_piecewise(self):
         """
-        Calculate flood damage costs based on water level and system state
-        
-        Args:
-            water_levels: tuple (slr_value, surge_value) in meters
-            system_state: int (0-3) representing system configuration:
-                0: No floodwalls
-                1: Only lower floodwall (F1)
-                2: Only higher floodwall (F2)
-                3: Both floodwalls (F1, F2)
-        
+        Tabulate the flooded volume cascade of each system state
+
         Returns:
-            Dictionary containing monetary and carbon costs
+            List indexed by system_state of (breakpoints, coefs) tables,
+            see cost_calculators.piecewise
         """
-        slr_value, surge_value = water_levels
-        total_height = slr_value + surge_value
-        
-        # Calculate flooded volume based on system state
-        if system_state == 0:  # No floodwalls
-            vol_f = 0.5 * (1/self.params.slope) * total_height**2
-            
-        elif system_state == 1:  # Only F1
-            if (total_height > self.b1) and (total_height <= self.t1):
-                area = 0.5 * self.b1 * self.b1 * (1/self.params.slope) + \
-                       (total_height - self.b1) * self.b1 * (1/self.params.slope)
-            else:
-                area = 0.5 * (1/self.params.slope) * total_height**2
-            vol_f = area
-            
-        elif system_state == 2:  # Only F2
-            if (total_height > self.b2) and (total_height <= self.t2):
-                area = 0.5 * self.b2 * self.b2 * (1/self.params.slope) + \
-                       (total_height - self.b2) * self.b2 * (1/self.params.slope)
-            else:
-                area = 0.5 * (1/self.params.slope) * total_height**2
-            vol_f = area
-            
-        else:  # Both floodwalls (system state 3)
-            if total_height <= self.b1:
-                area = 0.5 * (1/self.params.slope) * total_height**2
-            elif total_height > self.b1 and total_height <= self.t1:
-                area = 0.5 * (1/self.params.slope) * self.b1**2 + \
-                       (total_height - self.b1) * self.b1 * (1/self.params.slope)
-            elif total_height > self.t1 and total_height <= self.b2:
-                area = 0.5 * (1/self.params.slope) * total_height**2
-            elif total_height > self.b2 and total_height <= self.t2:
-                area = 0.5 * (1/self.params.slope) * self.b2**2 + \
-                       (total_height - self.b2) * self.b2 * (1/self.params.slope)
-            else:
-                area = 0.5 * (1/self.params.slope) * total_height**2
-            vol_f = area
+        unprotected = quadratic(self._k, 0.0)
+        f1 = linear(self._slope_f1, self.b1, self._area_b1)  # Water held back by F1
+        f2 = linear(self._slope_f2, self.b2, self._area_b2)  # Water held back by F2
 
-        # Calculate monetary flood damage
-        c_flood = self.cf * vol_f / self.vol_z
-        
-        # Calculate carbon costs from flood damage
-        c_flood_carbon = self.calculate_flood_carbon_cost(c_flood)
-        
-        return {
-            'monetary': c_flood,
-            'carbon': c_flood_carbon
-        }
+        return [
+            # 0: No floodwalls
+            piecewise_table([], [unprotected]),
+            # 1: Only F1
+            piecewise_table([self.b1, self.t1], [unprotected, f1, unprotected]),
+            # 2: Only F2
+            piecewise_table([self.b2, self.t2], [unprotected, f2, unprotected]),
+            # 3: Both floodwalls; F1 holds back water up to its top, F2 anything above it
+            piecewise_table([self.b1, self.t1, self.b2, self.t2],
+                            [unprotected, f1, unprotected, f2, unprotected]),
+        ]
 
-    def calculate_construction_cost(self, action):
+    def _compute_construction_cost(self, action):
         """
         Calculate construction costs for given action
         
@@ -125,12 +99,9 @@ class TwoFloodwallCosts:
             monetary = base_cost_per_meter * self.h2
             carbon = self.calculate_construction_carbon(self.h2)
             
-        return {
-            'monetary': monetary,
-            'carbon': carbon
-        }
+        return Cost(monetary, carbon)
 
-    def calculate_maintenance_cost(self, system_state):
+    def _compute_maintenance_cost(self, system_state):
         """Calculate annual maintenance costs based on system state"""
         if system_state == 0:
             monetary = 0
@@ -139,25 +110,12 @@ class TwoFloodwallCosts:
             monetary = -100
             carbon = self.calculate_maintenance_carbon()
             
-        return {
-            'monetary': monetary,
-            'carbon': carbon
-        }
-
-    def calculate_flood_carbon_cost(self, flood_damage):
-        """Calculate carbon costs from flood damage"""
-        flood_cost_2007 = (flood_damage / 1000000) * 0.77
-        fd_ghg = 445.1 * flood_cost_2007
-        return fd_ghg  # Will be multiplied by SCC later
+        return Cost(monetary, carbon)
 
     def calculate_construction_carbon(self, height):
         """Calculate carbon costs from construction"""
-        cost_2007 = (8000 * height) * 0.89
-        cost_million = cost_2007 / 1000000
-        return cost_million * 243  # Will be multiplied by SCC later
+        return construction_carbon_floodwall(height)
 
     def calculate_maintenance_carbon(self):
         """Calculate carbon costs from maintenance"""
-        cost_2007 = 100 * 0.89
-        cost_million = cost_2007 / 1000000
-        return cost_million * 385  # Will be multiplied by SCC later 
\ No newline at end of file
+        return maintenance_carbon_floodwall()
@@ -0,0 +1,50 @@
+import warnings
+import numpy as np
+from values_slr import slr
+from values_surge import surge
+
+# Number of discretized SLR and storm surge states
+N_SLR_STATES = 77
+N_SURGE_STATES = 72
+
+# Water level in meters of each SLR and surge state
+SLR_M = np.array([slr(i) for i in range(N_SLR_STATES)], dtype=np.float64) * 0.01  # cm to m
+SURGE_M = np.array([surge(j) for j in range(N_SURGE_STATES)], dtype=np.float64) * 0.01  # cm to m
+
+
+def water_level_grid():
+    """
+    Water levels for every discretized (slr_state, surge_state) pair
+
+    Returns:
+        Tuple (slr_value, surge_value) of (N_SLR_STATES, N_SURGE_STATES)
+        arrays in meters
+    """
+    return np.broadcast_arrays(SLR_M[:, None], SURGE_M[None, :])
+
+
+def transition_cdf(transitions, name):
+    """
+    Cumulative sums of transition matrix rows, for sampling the next state
+    with searchsorted(side='right')
+
+    Rows are scaled to end at 1, and all-zero rows (unreachable states) are
+    kept. Warns about rows that neither sum to 1 nor are all zero, as
+    np.random.choice would reject them.
+
+    Args:
+        transitions: Array of transition matrices, rows along the last axis
+        name: Name of the transitions in the warning (e.g. the file)
+
+    Returns:
+        Array of the same shape as transitions
+    """
+    cdf = np.cumsum(transitions, axis=-1, dtype=np.result_type(transitions, np.float32))
+    total = cdf[..., -1:]
+    row_total = total[..., 0].astype(np.float64)
+    bad = (row_total > 0) & ~np.isclose(row_total, 1, rtol=0, atol=1e-4)
+    if bad.any():
+        warnings.warn(f'{bad.sum()} rows of {name} sum to between {row_total[bad].min():.3g} and '
+                      f'{row_total[bad].max():.3g} instead of 1, they are rescaled to 1 for sampling',
+                      RuntimeWarning, stacklevel=2)
+    return np.divide(cdf, total, out=cdf, where=total > 0)
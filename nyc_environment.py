@@ -1,17 +1,30 @@
 from gym import Env
 from gym.spaces import Box, Discrete, MultiDiscrete
+import threading
 import numpy as np
 import mat73
-from values_slr import slr
-from values_surge import surge
 
 from cost_calculators.two_floodwall_costs import TwoFloodwallCosts
 from cost_calculators.green_space_costs import GreenSpaceCosts
 from cost_calculators.oyster_reef_costs import OysterReefCosts
 from cost_calculators.salt_marsh_costs import SaltMarshCosts
+from cost_calculators.water_levels import SLR_M, SURGE_M, transition_cdf
+from nyc_environment_kernel import _step_kernel, COST_NAMES, CARBON_UPTAKE
 
 class NYCEnvironment(Env):
     """Modified NYC Environment with 5 components and system interactions"""
+
+    # Component order of actions and system states
+    COMP_NAMES = ('bronx', 'manhattan', 'brooklyn', 'queens', 'staten_island')
+
+    # Columns of the per-step cost matrix, see nyc_environment_kernel
+    COST_NAMES = COST_NAMES
+
+    # Transition matrices and SCC, loaded once and shared (read-only) by all instances
+    _SLR_T = None
+    _SURGE_T = None
+    _SCC = None
+    _tables_lock = threading.Lock()
     
     def __init__(self, params):
         # Basic environment parameters
@@ -23,64 +36,82 @@ class NYCEnvironment(Env):
             'lower_to_higher': params.get('lower_to_higher_factor', 0.15)   # j%
         }
         
+        # Random generator for water level transitions
+        self._rng = np.random.default_rng(params.get('seed', None))
+        
         # State space dimensions
         self.n_slr_states = 77
         self.n_surge_states = 72
         
         # Load transition matrices and SCC
-        self.slr_transitions = mat73.loadmat('t_slr_245.mat')['t_slr_avg']
-        self.surge_transitions = mat73.loadmat('t_surge.mat')['t_surge']
-        self.scc = mat73.loadmat('discounted_sum_scc_7_3.mat')['discounted_sum_scc']
-        
-        # Initialize components with their cost calculators
-        self.components = {
-            'bronx': {
-                'calculator': TwoFloodwallCosts(params.bronx_params),
-                'system_state': 0,  # No protection
-                'actions': [],  # Action history
-                'costs': []  # Cost history
-            },
-            'manhattan': {
-                'calculator': GreenSpaceCosts(params.manhattan_params),
-                'system_state': 0,
-                'actions': [],
-                'costs': []
-            },
-            'brooklyn': {
-                'calculator': TwoFloodwallCosts(params.brooklyn_params),
-                'system_state': 0,
-                'actions': [],
-                'costs': []
-            },
-            'queens': {
-                'calculator': OysterReefCosts(params.queens_params),
-                'system_state': 0,
-                'actions': [],
-                'costs': []
-            },
-            'staten_island': {
-                'calculator': SaltMarshCosts(params.staten_island_params),
-                'system_state': 0,
-                'actions': [],
-                'costs': []
-            }
-        }
+        self.slr_transitions, self.surge_transitions, self.scc = self._load_tables()
+
+        # Discount factor of each year
+        self.discount_table = self.discount_factor ** np.arange(self.horizon + 2, dtype=np.float64)
+
+        # Cumulative transition probabilities for sampling the next state with
+        # searchsorted (see transition_cdf)
+        self.slr_cdf = transition_cdf(self.slr_transitions, 't_slr_245.mat')
+        self.surge_cdf = transition_cdf(self.surge_transitions[0], 't_surge.mat')
         
-        # System state transition matrices (3 actions, 4 states)
-        self.system_trans = {
-            0: np.array([[1, 0, 0, 0],   # Do nothing
-                        [0, 1, 0, 0],
-                        [0, 0, 1, 0],
-                        [0, 0, 0, 1]]),
-            1: np.array([[0, 1, 0, 0],   # Build F1/Nature-based
-                        [0, 1, 0, 0],
-                        [0, 0, 0, 1],
-                        [0, 0, 0, 1]]),
-            2: np.array([[0, 0, 1, 0],   # Build F2/Floodwall
-                        [0, 0, 0, 1],
-                        [0, 0, 1, 0],
-                        [0, 0, 0, 1]])
-        }
+        # Initialize components with their cost calculators, as parallel
+        # per-component arrays in COMP_NAMES order
+        self._calculators = [
+            TwoFloodwallCosts(params.bronx_params),
+            GreenSpaceCosts(params.manhattan_params),
+            TwoFloodwallCosts(params.brooklyn_params),
+            OysterReefCosts(params.queens_params),
+            SaltMarshCosts(params.staten_island_params)
+        ]
+        self._system_states = np.zeros(len(self.COMP_NAMES), dtype=np.int8)  # No protection
+        # Action and (discounted) cost history, one slot per year of the episode
+        self._actions_hist = np.empty((len(self.COMP_NAMES), self.horizon + 1), dtype=np.int8)
+        self._costs_hist = np.empty((len(self.COMP_NAMES), self.horizon + 1, len(self.COST_NAMES)))
+        
+        # Flood damage tables of all components (precomputed by each
+        # calculator), indexed by (component, system_state, slr_state, surge_state)
+        self._damage_money = np.stack([c._damage_money for c in self._calculators])
+        self._damage_carbon = np.stack([c._damage_carbon for c in self._calculators])
+        
+        # Base and top heights of the critical floodwall of each component
+        # (F2 for Bronx and Brooklyn, F for the others)
+        self._crit_base = np.array([c.b2 for c in self._calculators])
+        self._crit_top = np.array([c.t2 for c in self._calculators])
+        
+        # Carbon absorption of each calculator, where it has one
+        carbon_fns = [getattr(c, 'calculate_carbon_absorption', None) for c in self._calculators]
+        
+        # (monetary, carbon) construction costs per action, (monetary, carbon)
+        # maintenance costs per system state and carbon uptake per system state,
+        # indexed by (component, action or system state)
+        self._construction_arr = np.array([[c.calculate_construction_cost(a) for a in range(3)]
+                                           for c in self._calculators], dtype=np.float64)
+        self._maintenance_arr = np.array([[c.calculate_maintenance_cost(s) for s in range(4)]
+                                          for c in self._calculators], dtype=np.float64)
+        self._uptake_arr = np.array([[fn(s) if fn is not None else 0 for s in range(4)]
+                                     for fn in carbon_fns], dtype=np.float64)
+        
+        # Costs of the current step, one row per component and one column per COST_NAMES entry
+        self._cost_buf = np.zeros((len(self.COMP_NAMES), len(self.COST_NAMES)))
+        
+        # System state transition matrices, indexed by (action, state, next state)
+        self.system_trans = np.array([
+            [[1, 0, 0, 0],   # Do nothing
+             [0, 1, 0, 0],
+             [0, 0, 1, 0],
+             [0, 0, 0, 1]],
+            [[0, 1, 0, 0],   # Build F1/Nature-based
+             [0, 1, 0, 0],
+             [0, 0, 0, 1],
+             [0, 0, 0, 1]],
+            [[0, 0, 1, 0],   # Build F2/Floodwall
+             [0, 0, 0, 1],
+             [0, 0, 1, 0],
+             [0, 0, 0, 1]]
+        ], dtype=np.int8)
+        
+        # Next system state of each (action, system state)
+        self.next_state_lut = np.argmax(self.system_trans, axis=-1).astype(np.int8)
         
         # Define interaction pairs (Higher slope → Lower slope)
         self.interaction_pairs = [
@@ -90,6 +121,9 @@ class NYCEnvironment(Env):
             ('brooklyn', 'bronx'),
             ('brooklyn', 'staten_island')
         ]
+        # Interaction pairs as edges between component indices
+        self._edge_high = np.array([self.COMP_NAMES.index(comp_a) for comp_a, _ in self.interaction_pairs])
+        self._edge_low = np.array([self.COMP_NAMES.index(comp_b) for _, comp_b in self.interaction_pairs])
         
         # Initialize state and action spaces
         self.action_space = MultiDiscrete([3, 3, 3, 3, 3])  # 3 actions for each component
@@ -106,7 +140,42 @@ class NYCEnvironment(Env):
         
         # Initial states
         self.initial_water_state = np.array([4, 1])  # Initial SLR and surge states
-        self.water_state = self.initial_water_state.copy()
+        self.water_state = np.empty(2, dtype=np.int32)  # Updated in place every step
+        self.water_state[:] = self.initial_water_state
+
+    @classmethod
+    def _load_tables(cls):
+        """
+        Load the SLR and surge transition matrices and the SCC series, only
+        on first use in the process
+        
+        Returns:
+            Tuple (slr_transitions, surge_transitions, scc) of read-only arrays
+        """
+        with cls._tables_lock:
+            if cls._SLR_T is None:
+                tables = []
+                for file_name, key in [('t_slr_245.mat', 't_slr_avg'),
+                                       ('t_surge.mat', 't_surge'),
+                                       ('discounted_sum_scc_7_3.mat', 'discounted_sum_scc')]:
+                    table = np.ascontiguousarray(mat73.loadmat(file_name)[key], dtype=np.float64)
+                    table.flags.writeable = False
+                    tables.append(table)
+                cls._SLR_T, cls._SURGE_T, cls._SCC = tables
+        return cls._SLR_T, cls._SURGE_T, cls._SCC
+
+    @property
+    def components(self):
+        """
+        Per-component view of the component arrays, keyed by name, with
+        'calculator', 'system_state', 'actions' and 'costs' entries.
+        Histories are copies covering the years stepped so far.
+        """
+        return {comp: {'calculator': self._calculators[i],
+                       'system_state': int(self._system_states[i]),
+                       'actions': self._actions_hist[i, :self.year].tolist(),
+                       'costs': [self._cost_dict(row) for row in self._costs_hist[i, :self.year]]}
+                for i, comp in enumerate(self.COMP_NAMES)}
 
     def step(self, actions):
         """
@@ -120,68 +189,30 @@ class NYCEnvironment(Env):
             reward: float, total cost for this timestep
             done: bool, whether episode has ended
             info: dict with detailed cost breakdown
+            
+        Raises:
+            RuntimeError: If the episode is done (horizon + 1 steps since reset)
+            ValueError: If actions are not 5 values in [0,1,2]
         """
+        if self.year > self.horizon:
+            raise RuntimeError(f'episode is done after {self.horizon + 1} steps, call reset()')
+        actions = self._check_actions(actions, (len(self.COMP_NAMES),))
+        
         # 1. Sample next water level state
         next_slr, next_surge = self._sample_water_levels()
-        self.water_state = np.array([next_slr, next_surge])
+        self.water_state[0] = next_slr
+        self.water_state[1] = next_surge
         
         # 2. Calculate water levels in meters
-        water_levels = (
-            slr(self.water_state[0]) * 0.01,  # cm to m
-            surge(self.water_state[1]) * 0.01  # cm to m
-        )
-        
-        # 3. Update system states based on actions
-        self._update_system_states(actions)
-        
-        # 4. Calculate costs for each component
-        component_costs = self._calculate_component_costs(water_levels)
+        total_height = SLR_M[next_slr] + SURGE_M[next_surge]
         
-        # 5. Apply system interactions
-        modified_costs = self._apply_system_interactions(component_costs, water_levels)
+        # 3-6. Update system states based on actions, calculate costs for each
+        # component, apply system interactions and discounting
+        costs = self._cost_buf
+        total_reward = self._advance(next_slr, next_surge, total_height, actions, costs)
         
-        # 6. Apply discounting at component level and calculate total reward
-        total_reward = 0
-        discounted_costs = {}
-        
-        for comp_name, costs in modified_costs.items():
-            # Apply discount to each monetary cost component separately
-            discount_factor = self.discount_factor ** self.year
-            
-            # Store discounted costs
-            discounted_costs[comp_name] = {
-                'flood_damage': costs['flood_damage'] * discount_factor,
-                'flood_carbon': costs['flood_carbon'],  # Already discounted through SCC
-                'construction': costs['construction'] * discount_factor,
-                'construction_carbon': costs['construction_carbon'],
-                'maintenance': costs['maintenance'] * discount_factor,
-                'maintenance_carbon': costs['maintenance_carbon']
-            }
-            
-            if 'carbon_uptake' in costs:
-                discounted_costs[comp_name]['carbon_uptake'] = costs['carbon_uptake']
-            
-            # Calculate total cost for this component by summing all cost components
-            component_total = (
-                # Monetary costs (discounted)
-                discounted_costs[comp_name]['flood_damage'] +
-                discounted_costs[comp_name]['construction'] +
-                discounted_costs[comp_name]['maintenance'] +
-                # Carbon costs (already discounted through SCC)
-                discounted_costs[comp_name]['flood_carbon'] +
-                discounted_costs[comp_name]['construction_carbon'] +
-                discounted_costs[comp_name]['maintenance_carbon']
-            )
-            
-            # Add carbon uptake if applicable
-            if 'carbon_uptake' in discounted_costs[comp_name]:
-                component_total += discounted_costs[comp_name]['carbon_uptake']
-            
-            # Add to total reward
-            total_reward += component_total
-            
-            # Store costs in component history
-            self.components[comp_name]['costs'].append(discounted_costs[comp_name])
+        discounted_costs = {comp_name: self._cost_dict(costs[i])
+                            for i, comp_name in enumerate(self.COMP_NAMES)}
         
         # 7. Check if episode is done
         done = self.year >= self.horizon
@@ -189,9 +220,9 @@ class NYCEnvironment(Env):
         
         # 8. Prepare observation and info
         observation = {
-            'water_state': self.water_state,
-            'system_states': {comp: self.components[comp]['system_state'] 
-                             for comp in self.components}
+            'water_state': self.water_state.copy(),
+            'system_states': {comp: int(self._system_states[i])
+                             for i, comp in enumerate(self.COMP_NAMES)}
         }
         
         info = {
@@ -201,175 +232,135 @@ class NYCEnvironment(Env):
         
         return observation, total_reward, done, info
 
-    def _sample_water_levels(self):
-        """Sample next SLR and surge states"""
-        # Sample SLR transition
-        trans_slr = self.slr_transitions[self.year]
-        trans_slr_state = trans_slr[int(self.water_state[0])]
-        next_slr = np.random.choice(np.array(range(self.n_slr_states)), 
-                                  p=trans_slr_state)
+    def rollout(self, actions_seq):
+        """
+        Run a whole episode from the initial state with a fixed action sequence
         
-        # Sample surge transition (stationary)
-        trans_surge_state = self.surge_transitions[0][int(self.water_state[1])]
-        next_surge = np.random.choice(np.array(range(self.n_surge_states)), 
-                                    p=trans_surge_state)
+        Equivalent to reset() followed by step(actions_seq[t]) for every year,
+        without building per-step observations and info dicts. Water states
+        are sampled from the same random generator as step draws them.
         
-        return next_slr, next_surge
+        Args:
+            actions_seq: array of shape (n_years, 5) with values in [0,1,2],
+                1 <= n_years <= horizon + 1
+            
+        Returns:
+            rewards: (n_years,) array of total cost per year
+            costs: (5, n_years, 7) array of discounted costs per component,
+                year and COST_NAMES entry
+                
+        Raises:
+            ValueError: If n_years is out of range or actions_seq is not
+                (n_years, 5) values in [0,1,2]
+        """
+        actions_seq = np.asarray(actions_seq)
+        n_years = len(actions_seq)
+        if not 1 <= n_years <= self.horizon + 1:
+            raise ValueError(f'actions_seq must cover 1 to {self.horizon + 1} years, got {n_years}')
+        actions_seq = self._check_actions(actions_seq, (n_years, len(self.COMP_NAMES)))
+        self.reset()
+        
+        # 1. Sample water level states (sequential, each depends on the last)
+        uniforms = self._rng.random((n_years, 2))
+        slr_states = np.empty(n_years, dtype=np.intp)
+        surge_states = np.empty(n_years, dtype=np.intp)
+        slr_state, surge_state = self.initial_water_state
+        for t in range(n_years):
+            slr_state = np.searchsorted(self.slr_cdf[t, slr_state], uniforms[t, 0], side='right')
+            surge_state = np.searchsorted(self.surge_cdf[surge_state], uniforms[t, 1], side='right')
+            slr_states[t], surge_states[t] = slr_state, surge_state
+        total_height = SLR_M[slr_states] + SURGE_M[surge_states]
+        
+        # 2. Costs and system states of every year, as in step
+        rewards = np.empty(n_years)
+        costs = self._cost_buf
+        for t in range(n_years):
+            self.year = t
+            rewards[t] = self._advance(int(slr_states[t]), int(surge_states[t]), float(total_height[t]),
+                                       actions_seq[t], costs)
+        
+        # Leave the environment where stepping through the episode would
+        self.year = n_years
+        self.water_state[:] = (slr_states[-1], surge_states[-1])
+        costs = self._costs_hist[:, :n_years].copy()
+        
+        return rewards, costs
 
-    def _calculate_component_costs(self, water_levels):
+    @staticmethod
+    def _check_actions(actions, shape):
         """
-        Calculate base costs for each component
+        Convert actions to the int64 array _step_kernel indexes its tables with
         
-        Args:
-            water_levels: Tuple of (slr_value, surge_value) in meters
+        Raises:
+            ValueError: If actions do not have the given shape or values in [0,1,2]
+                (non-integral values are rejected rather than truncated)
         """
-        component_costs = {}
-        for comp_name, comp in self.components.items():
-            calculator = comp['calculator']
-            system_state = comp['system_state']
-            
-            # Get flood damage costs
-            flood_costs = calculator.calculate_flood_damage(water_levels, system_state)
-
-            # Get construction costs if action was taken
-            if len(comp['actions']) > 0:
-                last_action = comp['actions'][-1]
-                construction_costs = calculator.calculate_construction_cost(
-                    last_action)
-            else:
-                construction_costs = {'monetary': 0, 'carbon': 0}
-            
-            # Get maintenance costs
-            maintenance_costs = calculator.calculate_maintenance_cost(
-                system_state)
-            
-            # Calculate carbon uptake if applicable
-            carbon_uptake = (calculator.calculate_carbon_absorption(system_state) 
-                           if hasattr(calculator, 'calculate_carbon_absorption') 
-                           else 0)
-            
-            # Store all costs
-            costs = {
-                'flood_damage': flood_costs['monetary'],
-                'flood_carbon': flood_costs['carbon'] * self.scc[self.year],
-                'construction': construction_costs['monetary'],
-                'construction_carbon': construction_costs['carbon'] * self.scc[self.year],
-                'maintenance': maintenance_costs['monetary'],
-                'maintenance_carbon': maintenance_costs['carbon'] * self.scc[self.year]
-            }
-            
-            if carbon_uptake != 0:
-                costs['carbon_uptake'] = carbon_uptake * self.scc[self.year]
-                
-            component_costs[comp_name] = costs
-            
-        return component_costs
+        values = np.asarray(actions)
+        actions = values.astype(np.int64)
+        if (actions.shape != shape or np.any(actions != values)
+                or actions.min() < 0 or actions.max() > 2):
+            raise ValueError(f'actions must have shape {shape} with values in [0,1,2], got {values.tolist()}')
+        return actions
 
-    def _apply_system_interactions(self, costs, water_levels):
+    def _advance(self, slr_state, surge_state, total_height, actions, costs):
         """
-        Apply lateral flooding effects considering bidirectional flow
+        Apply one year's actions and costs for the given water state, see
+        nyc_environment_kernel._step_kernel
         
-        Args:
-            costs: Dictionary of current costs for each component
-            water_levels: Tuple of (slr_value, surge_value) in meters
+        Writes the discounted costs of each component into costs, records
+        the year in the action and cost histories and returns the total reward.
         """
-        modified_costs = costs.copy()
-        total_height = water_levels[0] + water_levels[1]
+        self._actions_hist[:, self.year] = actions
+        self._system_states, total_reward = _step_kernel(
+            slr_state, surge_state, total_height, self._system_states, actions, self.next_state_lut,
+            self._damage_money, self._damage_carbon,
+            self._construction_arr, self._maintenance_arr, self._uptake_arr,
+            self._crit_base, self._crit_top, self._edge_high, self._edge_low,
+            self.interaction_factors['lower_to_higher'], self.interaction_factors['higher_to_lower'],
+            float(self.scc[self.year]), float(self.discount_table[self.year]), costs)
         
-        for comp_a, comp_b in self.interaction_pairs:
-            # Get critical floodwall parameters for both components
-            comp_a_has_wall = self._has_critical_floodwall(comp_a)
-            comp_b_has_wall = self._has_critical_floodwall(comp_b)
-            
-            if not (comp_a_has_wall and comp_b_has_wall):
-                # Get floodwall heights for both components
-                a_heights = self._get_critical_wall_heights(comp_a)
-                b_heights = self._get_critical_wall_heights(comp_b)
-                
-                # Check if water height is in critical range
-                if self._is_in_critical_range(total_height, a_heights):
-                    if not comp_b_has_wall:
-                        # B affects A (lower to higher)
-                        modified_costs[comp_a]['flood_damage'] *= (1 + self.interaction_factors['lower_to_higher'])
-                        modified_costs[comp_a]['flood_carbon'] *= (1 + self.interaction_factors['lower_to_higher'])
-                        
-                if self._is_in_critical_range(total_height, b_heights):
-                    if not comp_a_has_wall:
-                        # A affects B (higher to lower)
-                        modified_costs[comp_b]['flood_damage'] *= (1 + self.interaction_factors['higher_to_lower'])
-                        modified_costs[comp_b]['flood_carbon'] *= (1 + self.interaction_factors['higher_to_lower'])
-        
-        return modified_costs
+        # Store costs in component history
+        self._costs_hist[:, self.year, :] = costs
+        return total_reward
 
-    def _is_in_critical_range(self, water_height, wall_heights):
-        """
-        Check if water height is between base and top of critical floodwall
+    def _sample_water_levels(self):
+        """Sample next SLR and surge states"""
+        # Sample SLR transition
+        slr_cdf = self.slr_cdf[self.year, int(self.water_state[0])]
+        next_slr = int(np.searchsorted(slr_cdf, self._rng.random(), side='right'))
         
-        Args:
-            water_height: Total water height in meters
-            wall_heights: Tuple of (base_height, top_height) in meters
+        # Sample surge transition (stationary)
+        surge_cdf = self.surge_cdf[int(self.water_state[1])]
+        next_surge = int(np.searchsorted(surge_cdf, self._rng.random(), side='right'))
         
-        Returns:
-            Boolean indicating if water height is in critical range
-        """
-        base_height, top_height = wall_heights
-        return base_height < water_height <= top_height
+        return next_slr, next_surge
+
+    def _cost_dict(self, row):
+        """Cost breakdown of one row of the cost matrix, with carbon_uptake only if there is any"""
+        costs = dict(zip(self.COST_NAMES[:CARBON_UPTAKE], row[:CARBON_UPTAKE].tolist()))
+        if row[CARBON_UPTAKE] != 0:
+            costs['carbon_uptake'] = float(row[CARBON_UPTAKE])
+        return costs
 
-    def _get_critical_wall_heights(self, comp_name):
+    def reset(self, seed=None):
         """
-        Get base and top heights of critical floodwall for a component
+        Reset environment to initial state
         
         Args:
-            comp_name: Name of the component
-            
-        Returns:
-            Tuple of (base_height, top_height) in meters
+            seed: Optional seed to restart the water level random generator from
         """
-        calculator = self.components[comp_name]['calculator']
-        if comp_name in ['bronx', 'brooklyn']:
-            return (calculator.b2, calculator.t2)  # F2 is critical
-        else:
-            return (calculator.b2, calculator.t2)  # F is critical
-
-    def _has_critical_floodwall(self, comp_name):
-        """Check if component has its critical floodwall built"""
-        system_state = self.components[comp_name]['system_state']
-        
-        # For two-floodwall environments (Bronx, Brooklyn)
-        if comp_name in ['bronx', 'brooklyn']:
-            return system_state in [2, 3]  # Has F2
-        # For nature-based solution environments
-        else:
-            return system_state in [2, 3]  # Has F
-
-    def reset(self):
-        """Reset environment to initial state"""
+        if seed is not None:
+            self._rng = np.random.default_rng(seed)
+        
         self.year = 0
-        self.water_state = self.initial_water_state.copy()
+        self.water_state[:] = self.initial_water_state
         
         # Reset all components
-        for comp in self.components.values():
-            comp['system_state'] = 0
-            comp['actions'] = []
-            comp['costs'] = []
+        self._system_states = np.zeros(len(self.COMP_NAMES), dtype=np.int8)
+        self._actions_hist = np.empty((len(self.COMP_NAMES), self.horizon + 1), dtype=np.int8)
+        self._costs_hist = np.empty((len(self.COMP_NAMES), self.horizon + 1, len(self.COST_NAMES)))
             
         return {
-            'water_state': self.water_state,
-            'system_states': {comp: 0 for comp in self.components}
+            'water_state': self.water_state.copy(),
+            'system_states': {comp: 0 for comp in self.COMP_NAMES}
         }
-
-    def _update_system_states(self, actions):
-        """Update system states based on actions"""
-        for i, comp in enumerate(['bronx', 'manhattan', 'brooklyn', 'queens', 'staten_island']):
-            current_system = self.components[comp]['system_state']
-            action = actions[i]
-            
-            # Update system state using transition matrix
-            system_vector = np.zeros(4)
-            system_vector[current_system] = 1
-            new_system_vector = system_vector.dot(self.system_trans[action])
-            new_system = np.argmax(new_system_vector)
-            
-            # Update component info
-            self.components[comp]['system_state'] = new_system
-            self.components[comp]['actions'].append(action) 
\ No newline at end of file
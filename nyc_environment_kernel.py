@@ -0,0 +1,83 @@
+import numpy as np
+from numba import njit
+
+# Columns of the per-step cost matrix, shared with NYCEnvironment. Carbon
+# columns are multiplied by SCC, which discounts them; the others are discounted
+COST_NAMES = ('flood_damage', 'flood_carbon', 'construction', 'construction_carbon',
+              'maintenance', 'maintenance_carbon', 'carbon_uptake')
+(FLOOD_DAMAGE, FLOOD_CARBON, CONSTRUCTION, CONSTRUCTION_CARBON,
+ MAINTENANCE, MAINTENANCE_CARBON, CARBON_UPTAKE) = range(len(COST_NAMES))
+
+# First system state with the critical floodwall built: states 2 and 3 have
+# F2 (Bronx, Brooklyn) or F (nature-based components)
+CRITICAL_STATE = 2
+
+
+@njit(cache=True)
+def _step_kernel(slr_state, surge_state, total_height, sys_states, actions, next_state_lut,
+                 damage_money, damage_carbon, construction_arr, maintenance_arr, uptake_arr,
+                 crit_base, crit_top, edge_high, edge_low, lower_to_higher, higher_to_lower,
+                 scc_y, disc_y, costs):
+    """
+    One NYCEnvironment step after sampling the water state: update system
+    states, calculate costs, apply system interactions and discounting
+
+    Args:
+        slr_state, surge_state: Sampled water state indices
+        total_height: SLR + surge in meters
+        sys_states: (5,) system states before the actions
+        actions: (5,) actions in [0,1,2]
+        next_state_lut: (3, 4) next system state per (action, system state)
+        damage_money, damage_carbon: (5, 4, n_slr, n_surge) flood damage tables
+        construction_arr: (5, 3, 2) (monetary, carbon) construction costs per action
+        maintenance_arr: (5, 4, 2) (monetary, carbon) maintenance costs per system state
+        uptake_arr: (5, 4) carbon uptake per system state
+        crit_base, crit_top: (5,) critical floodwall heights
+        edge_high, edge_low: Component indices of each interaction pair
+        lower_to_higher, higher_to_lower: Interaction factors
+        scc_y, disc_y: SCC and discount factor of the year
+        costs: (5, 7) cost matrix, overwritten with the discounted costs
+
+    Returns:
+        Tuple (new system states, total reward)
+    """
+    n_comp = sys_states.shape[0]
+    new_states = np.empty_like(sys_states)
+
+    for i in range(n_comp):
+        action = actions[i]
+        state = next_state_lut[action, sys_states[i]]
+        new_states[i] = state
+
+        costs[i, FLOOD_DAMAGE] = damage_money[i, state, slr_state, surge_state]
+        costs[i, FLOOD_CARBON] = damage_carbon[i, state, slr_state, surge_state] * scc_y
+        costs[i, CONSTRUCTION] = construction_arr[i, action, 0]
+        costs[i, CONSTRUCTION_CARBON] = construction_arr[i, action, 1] * scc_y
+        costs[i, MAINTENANCE] = maintenance_arr[i, state, 0]
+        costs[i, MAINTENANCE_CARBON] = maintenance_arr[i, state, 1] * scc_y
+        costs[i, CARBON_UPTAKE] = uptake_arr[i, state] * scc_y
+
+    # Lateral flooding: each side of a pair is affected when the water is in
+    # its critical range and the other side has no critical floodwall
+    for e in range(edge_high.shape[0]):
+        a = edge_high[e]
+        b = edge_low[e]
+        if crit_base[a] < total_height <= crit_top[a] and new_states[b] < CRITICAL_STATE:
+            # B affects A (lower to higher)
+            costs[a, FLOOD_DAMAGE] *= 1 + lower_to_higher
+            costs[a, FLOOD_CARBON] *= 1 + lower_to_higher
+        if crit_base[b] < total_height <= crit_top[b] and new_states[a] < CRITICAL_STATE:
+            # A affects B (higher to lower)
+            costs[b, FLOOD_DAMAGE] *= 1 + higher_to_lower
+            costs[b, FLOOD_CARBON] *= 1 + higher_to_lower
+
+    # Discount monetary costs (carbon is discounted through SCC)
+    total_reward = 0.0
+    for i in range(n_comp):
+        costs[i, FLOOD_DAMAGE] *= disc_y
+        costs[i, CONSTRUCTION] *= disc_y
+        costs[i, MAINTENANCE] *= disc_y
+        for k in range(costs.shape[1]):
+            total_reward += costs[i, k]
+
+    return new_states, total_reward
@@ -1,13 +1,121 @@
+import functools
+from collections import namedtuple
+from typing import Final
 from gym import Env
 from gym.spaces import Box, Discrete
 import random
 import numpy as np
 import mat73
+from numba import njit
 from values_slr import slr
 from values_surge import surge
+from cost_calculators._carbon import K_FLOOD, construction_carbon_floodwall, maintenance_carbon_floodwall
+from cost_calculators.water_levels import transition_cdf
+from cost_calculators.piecewise import quadratic, linear, piecewise_table, pack_tables, evaluate_piecewise
+
+
+# SLR and surge transition files per climate model (SSP); all currently
+# use the SSP2-4.5 SLR transitions
+_SSP_FILES = {'119': ('t_slr_245.mat', 't_surge.mat'),
+              '245': ('t_slr_245.mat', 't_surge.mat'),
+              '585': ('t_slr_245.mat', 't_surge.mat')}
+
+# Input data of the environment, see _tables
+_EnvTables = namedtuple('_EnvTables', ['trans_slr', 'trans_surge', 'trans_slr_cdf', 'trans_surge_cdf',
+                                       'discounted_sum_scc'])
+
+
+@functools.lru_cache(maxsize=None)
+def _tables(ssp):
+    """
+    SLR and surge transition matrices of a climate model (key of
+    _SSP_FILES) with their cumulative probabilities, and discounted SCC
+    sums per year, loaded once per process and shared by all environments
+    as read-only arrays
+    """
+    slr_file, surge_file = _SSP_FILES[ssp]
+    # Probabilities as loaded, stored as C-contiguous float32
+    trans_slr = np.ascontiguousarray(mat73.loadmat(slr_file)['t_slr_avg'], dtype=np.float32)
+    trans_surge = np.ascontiguousarray(mat73.loadmat(surge_file)['t_surge'], dtype=np.float32)
+    discounted_sum_scc = np.asarray(mat73.loadmat('discounted_sum_scc_7_3.mat')['discounted_sum_scc'])
+    tables = _EnvTables(trans_slr, trans_surge,
+                        transition_cdf(trans_slr, slr_file), transition_cdf(trans_surge, surge_file),
+                        discounted_sum_scc)
+    for table in tables:
+        table.flags.writeable = False
+    return tables
+
+
+# Flood damage; module-level constants are compiled into _flood_cost as literals
+EXPOSURE_VALUE: Final = 15.3 * 1e6
+VULNERABILITY_FACTOR: Final = 0.07
+C_F: Final = - VULNERABILITY_FACTOR * EXPOSURE_VALUE
+GAMMA: Final = 0.97
+S: Final = 0.0085  # Slope of city
+INV_S: Final = 1 / S
+VOL_Z: Final = 0.5 * 8.50 * INV_S * 8.50
+CF_AREA: Final = C_F / VOL_Z  # Flood damage per unit flooded area
+# Bottom and top heights of floodwalls 1 and 2
+B1: Final = 0.2
+T1: Final = 1.7
+B2: Final = 1.9
+T2: Final = 3.4
+FLOODWALL_HEIGHT: Final = 1.5
+
+# Flooded area as a piecewise quadratic in water height, per system
+# (see cost_calculators.piecewise), packed into (4, 4) breakpoint and
+# (4, 5, 3) coefficient arrays
+_UNPROTECTED = quadratic(0.5 * INV_S, 0.0)
+_F1 = linear(B1 * INV_S, B1, 0.5 * B1 * B1 * INV_S)  # Water held back by floodwall 1
+_F2 = linear(B2 * INV_S, B2, 0.5 * B2 * B2 * INV_S)  # Water held back by floodwall 2
+_AREA_BREAKPOINTS, _AREA_COEFS = pack_tables([
+    # 0: No floodwalls
+    piecewise_table([], [_UNPROTECTED]),
+    # 1: Only floodwall 1
+    piecewise_table([B1, T1], [_UNPROTECTED, _F1, _UNPROTECTED]),
+    # 2: Only floodwall 2
+    piecewise_table([B2, T2], [_UNPROTECTED, _F2, _UNPROTECTED]),
+    # 3: Both floodwalls
+    piecewise_table([B1, T1, B2, T2], [_UNPROTECTED, _F1, _UNPROTECTED, _F2, _UNPROTECTED]),
+])
+
+
+@njit(cache=True)
+def _flood_cost(total_height, scc_sum, next_system, area_breakpoints, area_coefs):
+    """
+    Flood damage part of Environment.immediate_cost given the flood height
+    and the SCC sum of the year, with the flooded area tables
+    _AREA_BREAKPOINTS, _AREA_COEFS
+    """
+    if next_system < 0 or next_system >= area_breakpoints.shape[0]:
+        raise ValueError('invalid system')
+    area1 = evaluate_piecewise(total_height, area_breakpoints[next_system], area_coefs[next_system])
+    c_flood = CF_AREA * area1
+    c_flood_carbon = K_FLOOD * c_flood * scc_sum
+    return GAMMA*(c_flood + c_flood_carbon)
+
+
+def _flood_cost_vec(total_height, scc_sum, next_systems):
+    """_flood_cost over arrays of flood heights, yearly SCC sums and systems"""
+    # Flooded area; the segment index counts breakpoints below the height,
+    # as np.searchsorted in evaluate_piecewise
+    segment = (_AREA_BREAKPOINTS[next_systems] < total_height[:, None]).sum(axis=1)
+    coefs = _AREA_COEFS[next_systems, segment]
+    area1 = coefs[:, 0] + coefs[:, 1] * total_height + coefs[:, 2] * total_height * total_height
+    c_flood = CF_AREA * area1
+    c_flood_carbon = K_FLOOD * c_flood * scc_sum
+    return GAMMA*(c_flood + c_flood_carbon)
+
+
+# Construction cost per action:
+# 0: do nothing, 1: construct floodwall 1, 2: construct floodwall 2, 3: construct both floodwalls
+_ACTION_COST = np.array([0.0, -1.38e+04, -1.38e+04, -2 * -1.38e+04])
+# Maintenance cost per old system
+_MAINTENANCE_COST = np.array([0.0, -100.0, -100.0, -2*100.0])
+
 
 class Environment(Env):
-    def __init__(self, env_name, climate_model):
+    def __init__(self, env_name, climate_model, seed=None):
         # define your environment
         # action space, observation space
         self.year = 0
@@ -18,122 +126,237 @@ class Environment(Env):
         self.n_states_slr = 77
         self.n_states_surge = 72
         self.n_states_total = self.n_states_surge + self.n_states_slr
+        # Water level in cm of each SLR and surge state
+        self.slr_table = np.fromiter((slr(i) for i in range(self.n_states_slr)), dtype=np.float64)
+        self.surge_table = np.fromiter((surge(i) for i in range(self.n_states_surge)), dtype=np.float64)
 
         self.observation_space = Discrete(self.n_states_total)
-        self.initial_state = np.array([4, 1])
-        self.state = self.initial_state
+        self.initial_state = np.array([4, 1], dtype=np.int32)
+        # SLR and surge state indices, as Python ints
+        self.state_slr, self.state_surge = self.initial_state.tolist()
         self.initial_system = np.array([1, 0, 0, 0])
-        self.system = self.initial_system
-        self.previous_system = self.initial_system
+        # Indices of the one-hot current and previous systems
+        self.system_int = 0
+        self.previous_system_int = 0
+        if climate_model not in _SSP_FILES:
+            raise ValueError(f'not valid ssp {climate_model!r}, expected one of {list(_SSP_FILES)}')
         self.ssp = climate_model
         self.model = env_name
+        self.verbose = False  # Print the rewards of every step
+        self._rng = np.random.default_rng(seed)  # For the water level transitions
         self.system_trans = {0: np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]),
                              1: np.array([[0, 1, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 0, 1]]),
                              2: np.array([[0, 0, 1, 0], [0, 0, 0, 1], [0, 0, 1, 0], [0, 0, 0, 1]]),
                              3: np.array([[0, 0, 0, 1], [0, 0, 0, 1], [0, 0, 0, 1], [0, 0, 0, 1]])}
-
+        # Next system index per (action, previous system index), and one-hot
+        # system of each index
+        self.system_trans_lut = np.array([self.system_trans[a].argmax(axis=1) for a in range(self.n_actions)],
+                                         dtype=np.int8)
+        self._system_trans_rows = self.system_trans_lut.tolist()  # As nested lists of Python ints
+        self._system_onehot = np.eye(len(self.initial_system), dtype=self.initial_system.dtype)
+        self._system_onehot.flags.writeable = False  # system and previous_system return views of its rows
+
+        # State vector buffer (time, SLR one-hot, system one-hot) and the
+        # one-hot indices currently set in it
+        self._obs_buf = np.zeros(1 + self.n_states_slr + len(self.initial_system), dtype=np.float32)
+        self._prev_slr_idx = -1
+        self._prev_sys_idx = -1
+
+        tables = _tables(self.ssp)
         self.trans = self.get_transition(ssp=self.ssp)
         self.trans_slr = self.trans[0]
         self.trans_surge = self.trans[1]
+        # Cumulative transition probabilities for sampling the next state with searchsorted
+        self.trans_slr_cdf = tables.trans_slr_cdf
+        self.trans_surge_cdf = tables.trans_surge_cdf
+        self.discounted_sum_scc = tables.discounted_sum_scc
+        # Construction and maintenance costs, including their carbon costs,
+        # indexed by (year, action, old_system)
+        construction_carbon = construction_carbon_floodwall(FLOODWALL_HEIGHT) * self.discounted_sum_scc
+        maintenance_carbon = maintenance_carbon_floodwall() * self.discounted_sum_scc
+        self._fixed_cost_lut = ((_ACTION_COST[None, :, None] + construction_carbon[:, None, None])
+                                + (_MAINTENANCE_COST[None, None, :] + maintenance_carbon[:, None, None]))
         self.rewards_sys = self.get_rewards(env_model=self.model)
         self.terminal_rewards = self.get_terminal_reward(env_model=self.model)
+        # Terminal rewards indexed by (action, next_system, next_state_combined)
+        self.terminal_flat = np.ascontiguousarray(np.squeeze(np.asarray(self.terminal_rewards)), dtype=np.float64)
+
+    @property
+    def state(self):
+        """SLR and surge state indices"""
+        return np.array([self.state_slr, self.state_surge], dtype=np.int32)
+
+    @state.setter
+    def state(self, state):
+        self.state_slr, self.state_surge = int(state[0]), int(state[1])
+
+    @property
+    def system(self):
+        """One-hot current system"""
+        return self._system_onehot[self.system_int]
+
+    @system.setter
+    def system(self, system):
+        self.system_int = int(np.argmax(system))
+
+    @property
+    def previous_system(self):
+        """One-hot system before the last step"""
+        return self._system_onehot[self.previous_system_int]
+
+    @previous_system.setter
+    def previous_system(self, system):
+        self.previous_system_int = int(np.argmax(system))
 
     def step(self, action):
+        action = self._check_action(action)
         # take action
         # next state according to year and action taken from current state
         # SLR and surge state are independent of system and action: just depends on the year and the current state
-        trans_slr = self.trans_slr[self.year]
-        trans_slr_state = trans_slr[int(self.state[0])]
-        next_slr = np.random.choice(np.array(range(0, self.n_states_slr)), 1, p=trans_slr_state)
+        slr_cdf = self.trans_slr_cdf[self.year, self.state_slr]
+        next_slr = int(np.searchsorted(slr_cdf, self._rng.random(), side='right'))
 
-        trans_surge_state = self.trans_surge[0][int(self.state[1])]
-        next_surge = np.random.choice(np.array(range(0, self.n_states_surge)), 1, p=trans_surge_state)
+        surge_cdf = self.trans_surge_cdf[0, self.state_surge]
+        next_surge = int(np.searchsorted(surge_cdf, self._rng.random(), side='right'))
 
-        next_state = np.array([next_slr, next_surge])
+        next_state = (next_slr, next_surge)
 
         # reward according to the action taken, next system, and current state
 
         # retreive the previous system
-        prev_system = np.argmax(self.system)
+        prev_system = self.system_int
 
-        self.previous_system = self.system
-        system_trans_act = self.system_trans[int(action)]
-        self.system = self.system.dot(system_trans_act)
-        next_system = np.argmax(self.system)
+        self.previous_system_int = prev_system
+        next_system = self._system_trans_rows[action][prev_system]
+        self.system_int = next_system
         # get rewards model according to the environment set up- floodwalls or green resistance, etc.
         # rewards_sys = self.get_rewards(env_model=self.model)
         reward_ = self.immediate_cost(next_state, action, prev_system, next_system, self.year)
 
-        print(reward_)
+        if self.verbose:
+            print(reward_)
         # discounting and scaling the rewards
         # reward = (self.discount_reward ** self.year) * reward_
         reward = reward_
         reward = reward/1e6
-        print(reward)
+        if self.verbose:
+            print(reward)
 
         next_state_combined = self.get_combined(next_state)
         if self.year > self.horizon:
             done = True
-            terminal_reward_act = self.terminal_rewards[int(action)]
-            terminal_reward_act_sys = terminal_reward_act[int(next_system)]
-            terminal_reward = terminal_reward_act_sys[next_state_combined]
-            print(f'terminal reward')
-            reward = terminal_reward[0]/1e6
-            print(reward)
+            reward = self.terminal_flat[action, next_system, next_state_combined]/1e6
+            if self.verbose:
+                print(f'terminal reward')
+                print(reward)
         else:
             done = False
 
         info = {}
         self.year += 1
-        print(reward)
-        return next_state, reward, done, info
+        if self.verbose:
+            print(reward)
+        return np.array(next_state, dtype=np.int32), reward, done, info
+
+    def vector_step(self, states, system_ints, years, actions):
+        """
+        Advance N independent environments by one step, as step does for one
+
+        Args:
+            states: (N, 2) SLR and surge state indices
+            system_ints: (N,) system indices
+            years: (N,) years
+            actions: (N,) actions
+
+        Returns:
+            Tuple (next_states, next_system_ints, rewards, dones) of arrays
+
+        Raises:
+            ValueError: If an index is not an integer in its range
+            IndexError: If a state has no transitions (unreachable), where
+                step fails in the same way
+        """
+        states = np.asarray(states)
+        slr_states = self._check_indices('SLR states', states[:, 0], self.n_states_slr)
+        surge_states = self._check_indices('surge states', states[:, 1], self.n_states_surge)
+        system_ints = self._check_indices('system_ints', system_ints, len(self.initial_system))
+        years = self._check_indices('years', years, len(self._fixed_cost_lut))
+        actions = self._check_indices('actions', actions, self.n_actions)
+        u = self._rng.random((len(states), 2))
+
+        # First state whose cumulative probability exceeds the draw, as
+        # searchsorted(side='right') in step
+        slr_hit = u[:, 0:1] < self.trans_slr_cdf[years, slr_states]
+        surge_hit = u[:, 1:2] < self.trans_surge_cdf[0, surge_states]
+        no_transition = ~(slr_hit.any(axis=1) & surge_hit.any(axis=1))
+        if no_transition.any():
+            k = no_transition.argmax()
+            raise IndexError(f'{no_transition.sum()} states have no transitions, the first is '
+                             f'state {states[k].tolist()} in year {years[k]}')
+        next_slr = slr_hit.argmax(axis=1)
+        next_surge = surge_hit.argmax(axis=1)
+        next_states = np.stack([next_slr, next_surge], axis=1).astype(np.int32)
+
+        next_systems = self.system_trans_lut[actions, system_ints]
+        total_height = self.slr_table[next_slr]*10
+        rewards = (_flood_cost_vec(total_height, self.discounted_sum_scc[years], next_systems)
+                   + self._fixed_cost_lut[years, actions, system_ints]) / 1e6
+
+        dones = years > self.horizon
+        if dones.any():
+            next_state_combined = self.get_combined(next_states[dones].T)
+            rewards[dones] = self.terminal_flat[actions[dones], next_systems[dones], next_state_combined] / 1e6
+        return next_states, next_systems, rewards, dones
+
+    @staticmethod
+    def _check_indices(name, values, stop):
+        """values as an index array, rejecting non-integral values and those outside [0, stop)"""
+        values = np.asarray(values)
+        indices = values.astype(np.intp)
+        if values.size and (indices.min() < 0 or values.max() >= stop or np.any(indices != values)):
+            raise ValueError(f'{name} must be integers in [0, {stop}), got {values.tolist()}')
+        return indices
+
+    def _check_action(self, action):
+        """Action as an int index into the cost tables, rejecting non-integral actions and those outside the action space"""
+        if not (0 <= action < self.n_actions and action == int(action)):
+            raise ValueError(f'action must be an integer in [0, {self.n_actions}), got {action!r}')
+        return int(action)
 
     def render(self):
         raise NotImplemented
 
-    def reset(self):
+    def reset(self, seed=None):
         # reset your environment
+        # optionally restarting the water level random generator from seed
+        if seed is not None:
+            self._rng = np.random.default_rng(seed)
         self.year = 0
-        self.state = self.initial_state
-        self.system = self.initial_system
+        self.state_slr, self.state_surge = self.initial_state.tolist()
+        self.system_int = 0
         return self.state
 
     def get_state_vector(self, observation, time):
         horizon = 40 #number of years
-        slr = np.zeros(self.n_states_slr)
-        slr[int(observation[0])] = 1
-        # print(s.shape)
-        surge = np.zeros(self.n_states_surge)
-        surge[int(observation[1])] = 1
-        # print(s[int(state)])
-        # state_combined = np.concatenate(((np.array([time / horizon])), slr, surge), axis=None)
-        state_combined = np.concatenate(((np.array([time / horizon])), slr), axis=None)
-        # print(state_combined.shape)
-        state_combined = np.concatenate((state_combined, np.array(self.system).T), axis=None)
-        # print(state_combined.shape)
-        return state_combined
+        buf = self._obs_buf
+        buf[0] = time / horizon
+        # The surge state is not part of the state vector
+        slr_idx = 1 + int(observation[0])
+        if self._prev_slr_idx >= 0:
+            buf[self._prev_slr_idx] = 0
+        buf[slr_idx] = 1
+        self._prev_slr_idx = slr_idx
+        sys_idx = 1 + self.n_states_slr + self.system_int
+        if self._prev_sys_idx >= 0:
+            buf[self._prev_sys_idx] = 0
+        buf[sys_idx] = 1
+        self._prev_sys_idx = sys_idx
+        # Copy, as callers may keep the state vectors of several steps
+        return buf.copy()
 
     def get_transition(self, ssp):
-        if ssp == '119':
-            transitions_slr = mat73.loadmat('t_slr_245.mat')
-            trans_slr = np.array(transitions_slr['t_slr_avg'])
-            transitions_surge = mat73.loadmat('t_surge.mat')
-            trans_surge = np.array(transitions_surge['t_surge'])
-        elif ssp == '245':
-            transitions_slr = mat73.loadmat('t_slr_245.mat')
-            trans_slr = np.array(transitions_slr['t_slr_avg'])
-            transitions_surge = mat73.loadmat('t_surge.mat')
-            trans_surge = np.array(transitions_surge['t_surge'])
-        elif ssp == '585':
-            transitions_slr = mat73.loadmat('t_slr_245.mat')
-            trans_slr = np.array(transitions_slr['t_slr_avg'])
-            transitions_surge = mat73.loadmat('t_surge.mat')
-            trans_surge = np.array(transitions_surge['t_surge'])
-        else:
-            print(f'not valid ssp')
-
-        return trans_slr, trans_surge
-
+        tables = _tables(ssp)
+        return tables.trans_slr, tables.trans_surge
 
     def get_combined(self, state):
         slr = state[0]
@@ -143,136 +366,10 @@ class Environment(Env):
         return state_combined
 
     def immediate_cost(self, next_state, action, old_system, next_system, year):
-
-        # flood damage
-        exposure_value = 15.3 * 1e6 
-        vlunerability_factor = 0.07
-        c_f = - vlunerability_factor * exposure_value
-        gamma = 0.97
-        s = 0.0085
-        vol_z = 0.5 * 8.50 * (1 / s) * 8.50
-        slr_value = slr(next_state[0])
-        surge_value = surge(next_state[1])
+        action = self._check_action(action)
+        slr_value = self.slr_table[next_state[0]]
         # total_height = slr_value + surge_value
         total_height = slr_value*10
-        discounted_sum_scc_ = mat73.loadmat('discounted_sum_scc_7_3.mat')
-        discounted_sum_scc = np.array(discounted_sum_scc_['discounted_sum_scc'])
-        b1 = 0.2
-        t1 = 1.7
-        b2 = 1.9
-        t2 = 3.4
-        # flood cost
-        if next_system == 0:
-            vol_f = 0.5 * (1 / s) * total_height**2
-            c_flood = c_f * vol_f / vol_z
-            scc_sum = discounted_sum_scc[year]
-            c_flood_carbon = self.FloodDamageGHG(c_flood, scc_sum)
-        elif next_system == 1:
-            if (total_height > b1) and (total_height <= t1):
-                area1 = 0.5 * b1 * b1 * (1 / s) + (total_height - b1) * b1 * (1 / s)
-            else:
-                area1 = 0.5 * (1 / s) * total_height**2
-            vol_f = (area1 - 0)
-            c_flood = c_f * vol_f/ vol_z
-            scc_sum = discounted_sum_scc[year]
-            c_flood_carbon = self.FloodDamageGHG(c_flood, scc_sum)
-        elif next_system == 2:
-            if (total_height > b2) and (total_height <= t2):
-                area1 = 0.5 * b2 * b2* (1 / s) + (total_height - b2) * b2 * (1 / s)
-            else:
-                area1 = 0.5 * (1 / s) * total_height**2
-            vol_f = (area1 - 0)
-            c_flood = c_f * vol_f/ vol_z
-            scc_sum = discounted_sum_scc[year]
-            c_flood_carbon = self.FloodDamageGHG(c_flood, scc_sum)
-        elif next_system == 3:
-            if total_height <= b1:
-                area1 = 0.5 * (1 / s) * total_height**2
-            elif total_height > b1 and total_height <= t1:
-                area1 = 0.5 * (1/s) * b1**2 + (total_height - b1) * b1 * (1 / s)
-            elif total_height > t1 and total_height <= b2:
-                area1 = 0.5 * (1/s) * total_height**2
-            elif total_height > b2 and total_height <= t2:
-                area1 = 0.5 * (1/s) * b2**2 + (total_height - b2) * b2 * (1 / s)
-            else:
-                area1 = 0.5 * (1 / s) * total_height**2
-            vol_f = (area1 - 0)
-            c_flood = c_f * vol_f / vol_z
-            scc_sum = discounted_sum_scc[year]
-            c_flood_carbon = self.FloodDamageGHG(c_flood, scc_sum)
-        else:
-            print(f'invalid system')
-
-        flood_damage = gamma*(c_flood + c_flood_carbon)
-
-        # construction
-        if action == 0:  # do nothing
-            action_cost = 0
-            scc_sum = discounted_sum_scc[year]
-            action_carbon_cost = self.CarbonConstruction(1.5, scc_sum)
-        elif action == 1:  # construct floodwall 1
-            action_cost = -1.38e+04
-            scc_sum = discounted_sum_scc[year]
-            action_carbon_cost = self.CarbonConstruction(1.5, scc_sum)
-        elif action == 2:  # construct floodwall 2
-            action_cost = -1.38e+04
-            scc_sum = discounted_sum_scc[year]
-            action_carbon_cost = self.CarbonConstruction(1.5, scc_sum)
-        elif action == 3:  # construct both floodwalls
-            action_cost = -2 * -1.38e+04
-            scc_sum = discounted_sum_scc[year]
-            action_carbon_cost = self.CarbonConstruction(1.5, scc_sum)
-        else:
-            print(f'invalid action')
-
-        construction = action_cost + action_carbon_cost
-
-        if old_system == 0:
-            main_cost = 0
-            scc_sum = discounted_sum_scc[year]
-            main_carbon_cost = self.AnnualMaintain(scc_sum)
-        elif old_system == 1:
-            main_cost = -100
-            scc_sum = discounted_sum_scc[year]
-            main_carbon_cost = self.AnnualMaintain(scc_sum)
-        elif old_system == 2:
-            main_cost = -100
-            scc_sum = discounted_sum_scc[year]
-            main_carbon_cost = self.AnnualMaintain(scc_sum)
-        elif old_system == 3:
-            main_cost = -2*100
-            scc_sum = discounted_sum_scc[year]
-            main_carbon_cost = self.AnnualMaintain(scc_sum)
-        else:
-            print(f'invalid system')
-
-        maintenance = main_cost + main_carbon_cost
-
-        total_cost = flood_damage + construction + maintenance
-        return total_cost
-
-    def FloodDamageGHG(self, flood_damage, scc_sum):
-
-        Flood_Cost_2007 = (flood_damage / 1000000) * 0.77
-        FD_GHGI = 445.1
-        FD_GHG = 445.1 * Flood_Cost_2007
-        FD_GHG_C = FD_GHG * scc_sum
-
-        return FD_GHG_C
-
-    def CarbonConstruction(self, floodwall_height, scc_sum):
-        Floodwall_Cost_2007 = (8000 * floodwall_height) * 0.89
-        Floodwall_Cost_Million = Floodwall_Cost_2007 / 1000000
-        DCM_GHG = Floodwall_Cost_Million * 243
-        DCM_GHG_C = DCM_GHG * scc_sum
-
-        return DCM_GHG_C
-
-    def AnnualMaintain(self, scc_sum):
-        Floodwall_Maintenance_Cost_2007 = 100 * 0.89
-        Floodwall_Maintenance_Cost_2007_Million = Floodwall_Maintenance_Cost_2007 / 1000000
-        AM_GHG = Floodwall_Maintenance_Cost_2007_Million * 385
-        AM_GHG_C = AM_GHG * scc_sum
-
-        return AM_GHG_C
-
+        flood_damage = _flood_cost(total_height, self.discounted_sum_scc[year], next_system,
+                                   _AREA_BREAKPOINTS, _AREA_COEFS)
+        return flood_damage + self._fixed_cost_lut[year, action, old_system]